@@ -0,0 +1,74 @@
+"""Compare colour output with plain text: size and throughput per format.
+
+Each image is resized once. The plain ramp, one escape per cell (full
+colour, no coalescing) and run-coalesced colour at a few quantization levels
+are then all timed from those same arrays.
+
+    python benchmarks/bench_color.py --width 200 --bits 3 4 5
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_decode import synthetic_photo  # noqa: E402
+from image2ascii.color import COLOR_FORMATS, render_color  # noqa: E402
+from image2ascii.core import grayscale_image, render_ascii, resize_image  # noqa: E402
+
+
+def best_of(repeats, function):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+# A flat-shaded scene, closer to illustrations and screenshots than the noisy synthetic photo
+def synthetic_drawing(width=3000, height=2000):
+    y, x = np.ogrid[0:height, 0:width]
+    rgb = np.zeros((height, width, 3), dtype=np.uint8)
+    rgb[:] = (30, 60, 160)
+    rgb[(y > height * 0.6) & (x >= 0)] = (40, 140, 50)
+    rgb[np.hypot(x - width * 0.7, y - height * 0.25) < height * 0.12] = (250, 220, 60)
+    rgb[(abs(x - width * 0.3) < width * 0.08) & (y > height * 0.35) & (y < height * 0.8)] = (150, 60, 40)
+    return Image.fromarray(rgb, "RGB")
+
+
+def report(name, plain_bytes, seconds, output):
+    print(f"  {name:24} {len(output) / 1024:9.1f} KB  x{len(output) / plain_bytes:5.1f}  "
+          f"{seconds * 1000:7.2f} ms  {len(output) / seconds / 1e6:7.1f} MB/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=200)
+    parser.add_argument("--bits", type=int, nargs="+", default=[3, 4, 5])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for image_name, image in [("photo", synthetic_photo(12)), ("drawing", synthetic_drawing())]:
+        resized = resize_image(image, args.width)
+        pixels = np.array(grayscale_image(resized))
+        rgb = np.array(resized.convert("RGB"))
+        print(f"{image_name}: {pixels.shape[1]}x{pixels.shape[0]} cells")
+
+        seconds, plain = best_of(args.repeats, lambda: render_ascii(pixels))
+        report("plain text", len(plain), seconds, plain)
+        for fmt in COLOR_FORMATS:
+            seconds, output = best_of(args.repeats, lambda: render_color(pixels, rgb, fmt, bits=8, coalesce=False))
+            report(f"{fmt} per cell", len(plain), seconds, output)
+            for bits in args.bits:
+                seconds, output = best_of(args.repeats, lambda: render_color(pixels, rgb, fmt, bits=bits))
+                report(f"{fmt} {bits}-bit runs", len(plain), seconds, output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Compare full-resolution decoding with reduced-resolution decoding.
+
+Builds large synthetic photos (24 megapixels by default) and converts each one
+twice: the old way (full decode, then ``resize_image``) and through
+``load_resized``, which uses JPEG DCT scaling via ``Image.draft`` and
+``Image.reduce`` before the final resample. Reports wall time and the size of
+the decoded pixel buffer each path had to hold, plus the peak RSS of a fresh
+spawned worker process per measurement.
+
+    python benchmarks/bench_decode.py --megapixels 24 --width 200
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image2ascii.core import decode_for_size, grayscale_image, resize_image, resolve_dimensions  # noqa: E402
+
+
+# Smooth photo-like content: rings and gradients with mild noise, so JPEG compresses it realistically
+def synthetic_photo(megapixels, seed=0):
+    width = int((megapixels * 1e6 * 3 / 2) ** 0.5)
+    height = width * 2 // 3
+    y, x = np.ogrid[0:height, 0:width]
+    rings = (np.sin(np.hypot(x - width / 3, y - height / 2) / 40.0) + 1) * 60
+    red = (x * 120 / width + rings).astype(np.uint8)
+    green = (y * 120 / height + rings).astype(np.uint8)
+    blue = np.broadcast_to((rings * 1.5).astype(np.uint8), (height, width))
+    noise = np.random.default_rng(seed).integers(0, 12, (height, width, 3), dtype=np.uint8)
+    return Image.fromarray(np.dstack([red, green, blue]) + noise, "RGB")
+
+
+def decoded_bytes(image):
+    return image.size[0] * image.size[1] * len(image.getbands())
+
+
+def full_path(path, width):
+    with Image.open(path) as image:
+        image.load()
+        held = decoded_bytes(image)
+        result = grayscale_image(resize_image(image, new_width=width))
+    return result, held
+
+
+def draft_path(path, width):
+    with Image.open(path) as image:
+        size = resolve_dimensions(image.size, width)
+        decoded, box = decode_for_size(image, size)
+        held = decoded_bytes(image)  # After draft() but before any reduce()
+        result = grayscale_image(decoded.resize(size, box=box))
+    return result, held
+
+
+PATHS = {"full": full_path, "draft": draft_path}
+
+
+# Peak resident memory of this process in bytes. VmHWM is reset by exec, unlike ru_maxrss,
+# which a spawned worker would inherit from the parent.
+def peak_rss():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# Runs in a freshly spawned process so peak memory reflects only this measurement
+def measure(path_name, path, width):
+    start = time.perf_counter()
+    result, held = PATHS[path_name](path, width)
+    elapsed = time.perf_counter() - start
+    return elapsed, held, peak_rss(), np.array(result)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=24)
+    parser.add_argument("--width", type=int, default=200, help="target width in characters")
+    parser.add_argument("--formats", nargs="+", default=["jpg", "png"])
+    args = parser.parse_args(argv)
+
+    photo = synthetic_photo(args.megapixels)
+    print(f"Source {photo.size[0]}x{photo.size[1]} ({photo.size[0] * photo.size[1] / 1e6:.1f} MP), "
+          f"target width {args.width}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for fmt in args.formats:
+            path = os.path.join(workdir, f"photo.{fmt}")
+            photo.save(path, **({"quality": 90} if fmt == "jpg" else {}))
+
+            results = {}
+            for path_name in PATHS:
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                    results[path_name] = executor.submit(measure, path_name, path, args.width).result()
+
+            (full_time, full_held, full_rss, full_pixels) = results["full"]
+            (draft_time, draft_held, draft_rss, draft_pixels) = results["draft"]
+            mean_error = np.abs(full_pixels.astype(int) - draft_pixels.astype(int)).mean()
+            print(f"{fmt:4}  full  {full_time * 1000:8.1f} ms  decoded {full_held / 1e6:7.1f} MB  "
+                  f"peak RSS {full_rss / 1e6:7.1f} MB")
+            print(f"{fmt:4}  draft {draft_time * 1000:8.1f} ms  decoded {draft_held / 1e6:7.1f} MB  "
+                  f"peak RSS {draft_rss / 1e6:7.1f} MB")
+            print(f"{fmt:4}  speedup x{full_time / draft_time:.1f}, decoded buffer x{full_held / draft_held:.0f} "
+                  f"smaller, mean grayscale difference {mean_error:.2f}/255")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
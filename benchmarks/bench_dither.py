@@ -0,0 +1,95 @@
+"""Compare dithered conversion with plain conversion, against a budget of 2x the plain cost.
+
+Two measurements per width. The first is the mapping alone on an already
+resized grayscale array: dither plus ``render_ascii`` against ``render_ascii``.
+It has no budget. Plain mapping is one table lookup per cell, about 40 us for
+the 200 x 47 cells of a 200 column image, so 2x would leave 40 us for any
+pass over the cells; even Bayer's single lookup more costs several times
+that. These lines show what dithering adds in milliseconds. The second is the
+whole ``image_to_ascii`` conversion of a saved photo, decode included. That
+is what a user waits for, and the 2x budget applies to it; the script exits
+with status 1 when a method goes over. Use a small ``--megapixels`` to check
+the budget where decoding is cheapest.
+
+    python benchmarks/bench_dither.py --widths 80 200 --formats jpg png
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_decode import synthetic_photo  # noqa: E402
+from image2ascii.core import (dither_for_ramp, grayscale_image, image_to_ascii, render_ascii,  # noqa: E402
+                              resize_image)
+from image2ascii.dither import DITHERS  # noqa: E402
+
+# A dithered conversion may cost at most this many times a plain one
+BUDGET = 2.0
+
+
+def best_of(repeats, function):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def report_added(label, plain, seconds):
+    print(f"  {label:32} {seconds * 1000:8.2f} ms  (+{(seconds - plain) * 1000:.2f} ms)")
+
+
+# Print a method's time against the plain conversion, returning whether it is within budget
+def report(label, plain, seconds):
+    ratio = seconds / plain
+    verdict = "ok" if ratio <= BUDGET else "OVER BUDGET"
+    print(f"  {label:32} {seconds * 1000:8.2f} ms  x{ratio:5.2f}  {verdict}")
+    return ratio <= BUDGET
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=12)
+    parser.add_argument("--widths", type=int, nargs="+", default=[80, 200])
+    parser.add_argument("--formats", nargs="+", default=["jpg", "png"])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+    methods = [method for method in DITHERS if method != "none"]
+
+    photo = synthetic_photo(args.megapixels)
+    for width in args.widths:
+        pixels = np.array(grayscale_image(resize_image(photo, width)))
+        print(f"{width} columns ({pixels.shape[1]}x{pixels.shape[0]} cells), mapping only "
+              f"(no budget: plain is one lookup per cell):")
+        plain = best_of(args.repeats, lambda: render_ascii(pixels))
+        print(f"  {'plain':32} {plain * 1000:8.2f} ms")
+        for method in methods:
+            seconds = best_of(args.repeats, lambda: render_ascii(dither_for_ramp(pixels, dither=method)))
+            report_added(method, plain, seconds)
+
+    over = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for fmt in args.formats:
+            path = os.path.join(workdir, f"photo.{fmt}")
+            photo.save(path)
+            for width in args.widths:
+                print(f"{fmt} {width} columns, whole conversion (budget x{BUDGET:g}):")
+                plain = best_of(args.repeats, lambda: image_to_ascii(path, width))
+                print(f"  {'plain':32} {plain * 1000:8.2f} ms")
+                for method in methods:
+                    seconds = best_of(args.repeats, lambda: image_to_ascii(path, width, dither=method))
+                    if not report(method, plain, seconds):
+                        over.append(f"{method} at {width} columns from {fmt}")
+    for case in over:
+        print(f"OVER BUDGET {case}", file=sys.stderr)
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
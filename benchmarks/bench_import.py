@@ -0,0 +1,88 @@
+"""Check import times of the package and the conversion core against a budget.
+
+Each import is timed in a fresh interpreter (median of several runs). The
+budget is:
+
+    import image2ascii          under 10 ms, loading no numpy, Pillow, pyglet or tkinter
+    import image2ascii.core     under 15 ms on top of NumPy itself, loading no Pillow,
+                                pyglet or tkinter
+
+The core is timed with NumPy already imported, since the core cannot avoid it
+and its cost depends on the machine. Exits with 1 when over budget.
+
+    python benchmarks/bench_import.py
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PACKAGE_BUDGET_MS = 10.0
+CORE_OVERHEAD_BUDGET_MS = 15.0
+
+HEAVY_MODULES = ["numpy", "PIL", "pyglet", "tkinter"]
+
+PROBE = """
+import json, sys, time
+{preload}
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+# Import module in a fresh interpreter after preload, returning (seconds, heavy modules loaded)
+def probe(module, preload=""):
+    code = PROBE.format(module=module, heavy=HEAVY_MODULES, preload=preload)
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    result = json.loads(output)
+    return result["seconds"], result["loaded"]
+
+
+def median_import(module, repeats, preload=""):
+    samples = [probe(module, preload) for _ in range(repeats)]
+    return statistics.median(seconds for seconds, _ in samples) * 1000, samples[-1][1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    # One throwaway run so every measurement sees warm file caches and compiled bytecode
+    probe("image2ascii.core")
+
+    numpy_ms, _ = median_import("numpy", args.repeats)
+    package_ms, package_loaded = median_import("image2ascii", args.repeats)
+    core_overhead_ms, _ = median_import("image2ascii.core", args.repeats, preload="import numpy")
+    _, core_loaded = probe("image2ascii.core")
+
+    print(f"numpy                       {numpy_ms:7.1f} ms")
+    print(f"image2ascii                 {package_ms:7.1f} ms  (budget {PACKAGE_BUDGET_MS:g} ms)  "
+          f"loads: {', '.join(package_loaded) or 'nothing heavy'}")
+    print(f"image2ascii.core over numpy {core_overhead_ms:7.1f} ms  (budget {CORE_OVERHEAD_BUDGET_MS:g} ms)  "
+          f"loads: {', '.join(core_loaded) or 'nothing heavy'}")
+
+    failures = []
+    if package_ms > PACKAGE_BUDGET_MS:
+        failures.append(f"import image2ascii took {package_ms:.1f} ms")
+    if package_loaded:
+        failures.append(f"import image2ascii loaded {', '.join(package_loaded)}")
+    if core_overhead_ms > CORE_OVERHEAD_BUDGET_MS:
+        failures.append(f"import image2ascii.core took {core_overhead_ms:.1f} ms over numpy")
+    if set(core_loaded) - {"numpy"}:
+        failures.append(f"import image2ascii.core loaded {', '.join(set(core_loaded) - {'numpy'})}")
+
+    for failure in failures:
+        print(f"OVER BUDGET {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
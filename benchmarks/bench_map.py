@@ -0,0 +1,55 @@
+"""Measure how character mapping scales with the number of row-band threads.
+
+Maps one large grayscale array with ``render_ascii`` at each worker count and
+checks every result against the single-threaded output. Next to the wall
+time it reports the CPU time of the whole process, so ``busy`` (CPU over wall)
+shows how many cores the threads actually kept working. Speedups depend on
+the cores available; on a single core every count runs at about the same
+speed, so only a run on a multi-core machine says anything about scaling.
+
+    python benchmarks/bench_map.py --size 8000 6000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image2ascii.core import render_ascii  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, nargs=2, default=[8000, 6000], metavar=("COLUMNS", "ROWS"))
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    columns, rows = args.size
+    pixels = np.random.default_rng(0).integers(0, 256, (rows, columns), dtype=np.uint8)
+    expected = render_ascii(pixels)
+    print(f"{columns}x{rows} cells on {os.cpu_count()} CPUs")
+
+    baseline = None
+    for workers in args.workers:
+        times = []
+        for _ in range(args.repeats):
+            start_cpu = time.process_time()
+            start = time.perf_counter()
+            result = render_ascii(pixels, workers=workers)
+            times.append((time.perf_counter() - start, time.process_time() - start_cpu))
+        if result != expected:
+            print(f"OUTPUT MISMATCH with {workers} workers", file=sys.stderr)
+            return 1
+        best, cpu = min(times)
+        baseline = baseline or best
+        print(f"{workers:3} workers  {best * 1000:8.1f} ms  x{baseline / best:.2f}  "
+              f"{rows * columns / best / 1e6:7.0f} Mcells/s  busy {cpu / best:.2f} CPUs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
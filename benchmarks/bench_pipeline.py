@@ -0,0 +1,227 @@
+"""Benchmark every stage of the conversion pipeline.
+
+Generates deterministic synthetic images across sizes, modes and formats,
+then converts each with the production ``image_to_ascii`` and times the file
+write. The stages come from the conversion's own instrumentation:
+``decode`` (``decode_for_size``, with JPEG draft and ``reduce()``),
+``resize``, ``grayscale`` and ``map``, plus ``total`` for the whole call. A
+regression in any of those paths therefore shows up here.
+
+    python benchmarks/bench_pipeline.py --quick
+    python benchmarks/bench_pipeline.py --save-baseline
+    python benchmarks/bench_pipeline.py --baseline benchmarks/baseline.json
+
+Results are written as JSON. With ``--baseline`` the run fails (exit code 1)
+when any stage is slower than the stored median by more than ``--tolerance``.
+Baselines are machine specific, so they are generated locally rather than
+committed. Every run also checks that ``image_to_ascii`` and the fast mapping
+paths produce exactly the output of the original per-pixel loop.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image2ascii.core import (ASCII_CHARS, grayscale_image, image_to_ascii, load_resized,  # noqa: E402
+                              pixel_to_ascii, render_ascii)
+from image2ascii.instrument import Instrumentation  # noqa: E402
+
+SIZES = {
+    "256": (256, 256),
+    "1K": (1024, 1024),
+    "2K": (2048, 2048),
+    "4K": (3840, 2160),
+    "8K": (7680, 4320),
+}
+QUICK_SIZES = ["256", "1K"]
+MODES = ["L", "RGB", "RGBA", "LA", "P"]
+FORMATS = ["png", "jpg", "bmp", "webp"]
+
+# Modes each format can store without Pillow converting on save
+FORMAT_MODES = {
+    "png": {"L", "RGB", "RGBA", "LA", "P"},
+    "jpg": {"L", "RGB"},
+    "bmp": {"L", "RGB", "RGBA", "P"},
+    "webp": {"RGB", "RGBA"},
+}
+
+STAGES = ["decode", "resize", "grayscale", "map", "total", "write"]
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+# The original per-pixel mapping, kept as the reference for output checks
+def reference_pixel_to_ascii(image):
+    pixels = np.array(image)
+    ascii_str = ''
+    for pixel_row in pixels:
+        for pixel in pixel_row:
+            ascii_str += ASCII_CHARS[pixel // 32] if pixel != 255 else ' '
+        ascii_str += '\n'
+    return ascii_str
+
+
+# Deterministic test card: gradients, rings and seeded noise so every codec has real work to do
+def synthetic_image(size, mode, seed=0):
+    width, height = size
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    rng = np.random.default_rng(seed)
+    rings = (np.sin(np.hypot(x - width / 2, y - height / 2) / 9.0) + 1) * 64
+    red = (x / width * 255 * 0.5 + rings).astype(np.uint8)
+    green = (y / height * 255 * 0.5 + rings).astype(np.uint8)
+    blue = rng.integers(0, 256, (height, width), dtype=np.uint8)
+    image = Image.fromarray(np.dstack([red, green, blue]), "RGB")
+
+    if mode == "RGB":
+        return image
+    if mode == "L":
+        return image.convert("L")
+    if mode == "P":
+        return image.quantize(64)
+    # Alpha: opaque centre, fully transparent border so the white-fill path is exercised
+    alpha = np.full((height, width), 255, dtype=np.uint8)
+    alpha[: height // 8] = 0
+    alpha[:, : width // 8] = 0
+    image.putalpha(Image.fromarray(alpha))
+    return image if mode == "RGBA" else image.convert("LA")
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+# Time one production conversion and its write, returning ({stage: seconds}, ASCII bytes)
+def run_pipeline(path, output_path, width):
+    timings = {}
+    instrumentation = Instrumentation(enabled=True)
+    instrumentation.subscribe(lambda event: timings.__setitem__(event["stage"], event["wall"]))
+    ascii_bytes, timings["total"] = timed(image_to_ascii, path, width, None, instrumentation)
+
+    def write():
+        with open(output_path, "w") as f:
+            f.write(ascii_bytes.decode("ascii"))
+
+    _, timings["write"] = timed(write)
+    return timings, ascii_bytes
+
+
+# Check the conversion and every fast mapping path against the original loop, applied to the
+# grayscale image the production decode and resize produce
+def check_outputs(path, width, ascii_bytes):
+    with Image.open(path) as image:
+        gray = grayscale_image(load_resized(image, width))
+    expected = reference_pixel_to_ascii(gray)
+    return {
+        "image_to_ascii": ascii_bytes.decode("ascii") == expected,
+        "pixel_to_ascii": pixel_to_ascii(gray) == expected,
+        "render_ascii": render_ascii(np.array(gray)).decode("ascii") == expected,
+    }
+
+
+def run_suite(size_names, repeats, width, workdir):
+    results = {}
+    mismatches = []
+    for size_name in size_names:
+        for mode in MODES:
+            source = synthetic_image(SIZES[size_name], mode)
+            for fmt in FORMATS:
+                if mode not in FORMAT_MODES[fmt]:
+                    continue
+                case = f"{size_name}/{mode}/{fmt}"
+                path = os.path.join(workdir, f"{size_name}_{mode}.{fmt}")
+                source.save(path)
+
+                samples = {stage: [] for stage in STAGES}
+                for _ in range(repeats):
+                    timings, ascii_bytes = run_pipeline(path, os.path.join(workdir, "out.txt"), width)
+                    for stage, seconds in timings.items():
+                        samples[stage].append(seconds)
+
+                checks = check_outputs(path, width, ascii_bytes)
+                mismatches.extend(f"{case}: {name}" for name, ok in checks.items() if not ok)
+                results[case] = {stage: statistics.median(values) for stage, values in samples.items()}
+                print(f"{case:18} " + "  ".join(f"{stage} {results[case][stage] * 1000:8.2f} ms"
+                                                for stage in STAGES))
+                os.remove(path)
+    return results, mismatches
+
+
+# Compare medians with a stored baseline, returning a list of regression messages
+def find_regressions(results, baseline, tolerance, min_seconds=0.002):
+    regressions = []
+    for case, stages in results.items():
+        for stage, seconds in stages.items():
+            reference = baseline.get(case, {}).get(stage)
+            # Stages that take only a millisecond or two are too noisy to gate on
+            if reference is None or max(seconds, reference) < min_seconds:
+                continue
+            if seconds > reference * tolerance:
+                regressions.append(f"{case} {stage}: {seconds * 1000:.2f} ms vs baseline "
+                                   f"{reference * 1000:.2f} ms (x{seconds / reference:.2f})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--quick", action="store_true", help=f"only run sizes {', '.join(QUICK_SIZES)}")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--width", type=int, default=200, help="target width in characters")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON results")
+    parser.add_argument("--baseline", default=None, help="fail if a stage regresses against this file")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, default=None,
+                        help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="allowed slowdown factor before a stage counts as regressed (default: 1.5)")
+    parser.add_argument("--min-ms", type=float, default=2.0,
+                        help="ignore stages faster than this in both runs when checking regressions")
+    args = parser.parse_args(argv)
+
+    size_names = QUICK_SIZES if args.quick else args.sizes
+    with tempfile.TemporaryDirectory() as workdir:
+        results, mismatches = run_suite(size_names, args.repeats, args.width, workdir)
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "width": args.width,
+        "repeats": args.repeats,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    failed = False
+    for mismatch in mismatches:
+        print(f"OUTPUT MISMATCH {mismatch}", file=sys.stderr)
+        failed = True
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        for regression in find_regressions(results, baseline, args.tolerance, args.min_ms / 1000):
+            print(f"REGRESSION {regression}", file=sys.stderr)
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
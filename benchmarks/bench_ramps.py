@@ -0,0 +1,40 @@
+"""Time compiling each preset ramp: measuring glyphs, loading the cached table, and the in-memory hit.
+
+    python benchmarks/bench_ramps.py --font /path/to/DejaVuSansMono.ttf
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image2ascii.ramps import PRESET_RAMPS, compile_ramp  # noqa: E402
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--font", default=None)
+    parser.add_argument("--ramps", nargs="+", default=list(PRESET_RAMPS))
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name in args.ramps:
+            measure, (ordered, _) = timed(lambda: compile_ramp(name, args.font, cache_dir))
+            compile_ramp.cache_clear()  # Forget the table in memory, leaving the one on disk
+            disk, _ = timed(lambda: compile_ramp(name, args.font, cache_dir))
+            memory, _ = timed(lambda: compile_ramp(name, args.font, cache_dir))
+            print(f"{name:9} {len(ordered):3} chars  measured {measure * 1000:7.2f} ms  "
+                  f"cached table {disk * 1000:6.2f} ms  in memory {memory * 1e6:6.1f} us  {ordered[:24]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
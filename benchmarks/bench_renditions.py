@@ -0,0 +1,63 @@
+"""Compare separate conversions per width with one multi-width rendition pass.
+
+    python benchmarks/bench_renditions.py --widths 40 80 160 320
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_decode import synthetic_photo  # noqa: E402
+from image2ascii.core import image_to_ascii  # noqa: E402
+from image2ascii.renditions import render_renditions  # noqa: E402
+
+
+def best_of(repeats, function):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=12)
+    parser.add_argument("--widths", type=int, nargs="+", default=[40, 80, 160, 320])
+    parser.add_argument("--formats", nargs="+", default=["jpg", "png"])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    photo = synthetic_photo(args.megapixels)
+    widest = max(args.widths)
+    with tempfile.TemporaryDirectory() as workdir:
+        for fmt in args.formats:
+            path = os.path.join(workdir, f"photo.{fmt}")
+            photo.save(path)
+
+            one_time, _ = best_of(args.repeats, lambda: image_to_ascii(path, widest))
+            separate_time, separate = best_of(args.repeats, lambda: [image_to_ascii(path, w) for w in args.widths])
+
+            def renditions():
+                with Image.open(path) as image:
+                    return render_renditions(image, [(w, None) for w in args.widths])
+
+            rendition_time, rendered = best_of(args.repeats, renditions)
+            matches = [np.mean(np.frombuffer(a, np.uint8) == np.frombuffer(b, np.uint8))
+                       for a, b in zip(separate, rendered)]
+            print(f"{fmt:4}  one width {one_time * 1000:7.1f} ms  {len(args.widths)} separate "
+                  f"{separate_time * 1000:7.1f} ms  renditions {rendition_time * 1000:7.1f} ms  "
+                  f"(x{rendition_time / one_time:.2f} of one width, cells matching separate runs "
+                  f"{min(matches) * 100:.0f}-{max(matches) * 100:.0f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
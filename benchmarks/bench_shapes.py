@@ -0,0 +1,54 @@
+"""Compare glyph-shape matching with brightness mapping at the same output width.
+
+    python benchmarks/bench_shapes.py --widths 200 400
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_decode import synthetic_photo  # noqa: E402
+from image2ascii.core import image_to_ascii  # noqa: E402
+from image2ascii.shapes import glyph_set  # noqa: E402
+
+
+def best_of(repeats, function):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megapixels", type=float, default=12)
+    parser.add_argument("--widths", type=int, nargs="+", default=[200, 400])
+    parser.add_argument("--formats", nargs="+", default=["jpg", "png"])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    # Load the glyph features up front so the timings cover conversion only
+    start = time.perf_counter()
+    glyph_set()
+    print(f"glyph set ready in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    photo = synthetic_photo(args.megapixels)
+    with tempfile.TemporaryDirectory() as workdir:
+        for fmt in args.formats:
+            path = os.path.join(workdir, f"photo.{fmt}")
+            photo.save(path)
+            for width in args.widths:
+                brightness = best_of(args.repeats, lambda: image_to_ascii(path, width))
+                shape = best_of(args.repeats, lambda: image_to_ascii(path, width, mode="shape"))
+                print(f"{fmt:4} {width:5} columns  brightness {brightness * 1000:7.1f} ms  "
+                      f"shape {shape * 1000:7.1f} ms  (x{shape / brightness:.2f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
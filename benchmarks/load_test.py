@@ -0,0 +1,159 @@
+"""Load-test the local HTTP conversion service.
+
+Sends conversion requests from a number of concurrent client threads for a
+fixed duration and reports requests per second, latency percentiles and the
+count of each status code (429s show the backpressure limit at work).
+
+    python benchmarks/load_test.py --spawn --workers 4 --concurrency 16
+    python benchmarks/load_test.py --url http://127.0.0.1:8765 --duration 30
+
+With ``--spawn`` a server is started on a free port for the run and its
+``/metrics`` output is printed at the end.
+"""
+import argparse
+import collections
+import http.client
+import io
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# A smooth synthetic photo, encoded in memory
+def synthetic_upload(size, fmt):
+    width, height = size
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    rings = (np.sin(np.hypot(x - width / 2, y - height / 2) / 12.0) + 1) * 64
+    rgb = np.dstack([(x / width * 127 + rings), (y / height * 127 + rings), rings * 1.5]).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(rgb, "RGB").save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_server(host, port, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on {host}:{port} did not start")
+
+
+# One client thread: keep-alive connection, requests back to back until the deadline
+def client(host, port, path, body, deadline, results, lock):
+    connection = http.client.HTTPConnection(host, port, timeout=60)
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            connection.request("POST", path, body=body, headers={"Content-Type": "application/octet-stream"})
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+            if response.getheader("Connection", "").lower() == "close":
+                connection.close()
+        except (OSError, http.client.HTTPException):
+            status = "error"
+            connection.close()
+        elapsed = time.perf_counter() - start
+        with lock:
+            results.append((status, elapsed))
+        if status == 429:
+            time.sleep(0.005)  # Back off briefly, as a well-behaved client would
+    connection.close()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8765", help="service to test (ignored with --spawn)")
+    parser.add_argument("--spawn", action="store_true", help="start a server on a free port for the run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes of a spawned server")
+    parser.add_argument("--max-concurrent", type=int, default=None, help="concurrency limit of a spawned server")
+    parser.add_argument("--concurrency", type=int, default=8, help="client threads sending requests")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to send requests for")
+    parser.add_argument("--size", type=int, nargs=2, default=[1024, 768], metavar=("W", "H"),
+                        help="size of the uploaded image")
+    parser.add_argument("--format", default="png", help="encoding of the uploaded image")
+    parser.add_argument("--width", type=int, default=120, help="requested width in characters")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.spawn:
+        host, port = "127.0.0.1", free_port()
+        command = [sys.executable, "-m", "image2ascii.server", "--port", str(port), "--quiet",
+                   "--workers", str(args.workers)]
+        if args.max_concurrent:
+            command += ["--max-concurrent", str(args.max_concurrent)]
+        server = subprocess.Popen(command, cwd=ROOT)
+    else:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+
+    try:
+        wait_for_server(host, port)
+        body = synthetic_upload(tuple(args.size), args.format)
+        path = "/convert?" + urlencode({"width": args.width})
+        print(f"{args.concurrency} clients, {args.duration:g} s, {args.size[0]}x{args.size[1]} {args.format} "
+              f"({len(body) / 1e3:.0f} kB) at width {args.width}")
+
+        results = []
+        lock = threading.Lock()
+        deadline = time.monotonic() + args.duration
+        start = time.perf_counter()
+        threads = [threading.Thread(target=client, args=(host, port, path, body, deadline, results, lock))
+                   for _ in range(args.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        statuses = collections.Counter(status for status, _ in results)
+        ok = [seconds for status, seconds in results if status == 200]
+        print(f"{len(results)} requests in {elapsed:.2f} s: {len(ok) / elapsed:.1f} converted/s, "
+              f"{len(results) / elapsed:.1f} requests/s")
+        print("status " + ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items(), key=str)))
+        if ok:
+            print(f"latency of 200s: mean {statistics.mean(ok) * 1000:.1f} ms, "
+                  f"p50 {percentile(ok, 0.5) * 1000:.1f} ms, p95 {percentile(ok, 0.95) * 1000:.1f} ms, "
+                  f"p99 {percentile(ok, 0.99) * 1000:.1f} ms")
+
+        if server is not None:
+            connection = http.client.HTTPConnection(host, port, timeout=5)
+            connection.request("GET", "/metrics")
+            print(connection.getresponse().read().decode())
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Image2ASCII conversion package.
+
+Names are imported lazily on first access, so ``import image2ascii`` costs
+almost nothing and only the submodules actually used get loaded: the
+conversion core needs NumPy, Pillow is loaded when an image is first opened,
+and pyglet only when ``ImageApp`` (from ``image2ascii.gui``) is touched.
+``from image2ascii import *`` leaves ``ImageApp`` out, so it works on a
+machine without a display.
+``benchmarks/bench_import.py`` checks the import times against a budget.
+"""
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "ACCEPTED_FORMATS": "core",
+    "ASCII_CHARS": "core",
+    "ASCII_LUT": "core",
+    "MODES": "core",
+    "RATIO_ADJUSTMENT_NUM": "core",
+    "ascii_output_path": "core",
+    "build_ascii_lut": "core",
+    "decode_for_size": "core",
+    "grayscale_image": "core",
+    "image_to_ascii": "core",
+    "load_resized": "core",
+    "output_size": "core",
+    "pixel_to_ascii": "core",
+    "ramp_lut": "core",
+    "render_ascii": "core",
+    "resize_image": "core",
+    "resolve_dimensions": "core",
+    "ResultCache": "cache",
+    "cache_key": "cache",
+    "cached_image_to_ascii": "cache",
+    "image_to_color": "color",
+    "render_color": "color",
+    "DITHERS": "dither",
+    "dither_pixels": "dither",
+    "convert_frames_to_ascii": "frames",
+    "read_frame_sequence": "frames",
+    "ImageApp": "gui",
+    "NULL_INSTRUMENTATION": "instrument",
+    "Instrumentation": "instrument",
+    "Job": "jobs",
+    "JobCancelled": "jobs",
+    "JobQueue": "jobs",
+    "QueueFull": "jobs",
+    "PRESET_RAMPS": "ramps",
+    "compile_ramp": "ramps",
+    "PackedReader": "packed",
+    "decode_packed": "packed",
+    "pack_ascii": "packed",
+    "write_packed": "packed",
+    "GlyphAtlas": "preview",
+    "PreviewPyramid": "preview",
+    "TerminalScreen": "player",
+    "play": "player",
+    "GlyphSet": "shapes",
+    "shape_image_to_ascii": "shapes",
+    "convert_renditions": "renditions",
+    "render_renditions": "renditions",
+    "convert_image_streaming": "stream",
+}
+
+# Names that need a display, reachable as attributes but left out of star imports
+_GUI_NAMES = {"ImageApp"}
+
+__all__ = sorted(set(_EXPORTS) - _GUI_NAMES)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module_name}"), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
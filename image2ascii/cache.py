@@ -0,0 +1,212 @@
+"""Content-addressed on-disk cache of converted ASCII art.
+
+Entries are keyed on a hash of the source file's bytes plus everything that
+affects the output: the resolved target size, the character ramp, the mapping
+mode, the dither and ``RATIO_ADJUSTMENT_NUM``. A hit returns the stored text without
+decoding the image. The cache is capped in bytes and evicts least recently used entries;
+its index is rewritten atomically so a crash never leaves it half written.
+
+Entry files are written atomically and named by key, so other processes can
+read hits straight from them with ``read_cache_entry`` and report them back
+to the one process that owns the index. Hits only update recency in memory;
+the index is written on the next ``put`` or ``flush``.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from image2ascii.core import ASCII_CHARS, RATIO_ADJUSTMENT_NUM, image_to_ascii, output_size
+
+# Default size cap for the cache directory (bytes)
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+INDEX_NAME = "index.json"
+
+# Bump when the output for a given key could change
+CACHE_VERSION = 5
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "image2ascii")
+
+
+# Hash a file's contents without reading it into memory at once
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Build the cache key for converting image_path (a path or binary file object) at the requested size;
+# digest is the SHA-256 of the file's bytes and source_size the image's size when the caller already has them
+def cache_key(image_path, new_width=None, new_height=None, chars=ASCII_CHARS, mode="brightness", dither="none",
+              digest=None, source_size=None):
+    if source_size is None:
+        # Opening only reads the header, which is enough to resolve the output size
+        with Image.open(image_path) as image:
+            source_size = image.size
+    size = output_size(source_size, new_width, new_height)
+
+    params = json.dumps([CACHE_VERSION, size, chars, RATIO_ADJUSTMENT_NUM, mode, dither])
+    digest = digest or file_digest(image_path)
+    return hashlib.sha256(f"{digest}:{params}".encode("utf-8")).hexdigest()
+
+
+def cache_entry_path(directory, key):
+    return os.path.join(directory, f"{key}.txt")
+
+
+# The cached bytes for key read straight from its entry file, or None; safe from any process
+def read_cache_entry(directory, key):
+    try:
+        with open(cache_entry_path(directory, key), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class ResultCache:
+    """LRU cache of ASCII output stored as one file per entry plus a JSON index."""
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_CACHE_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self.index = self.load_index()
+        self.dirty = False  # Recency changed since the index was last written
+
+    def entry_path(self, key):
+        return cache_entry_path(self.directory, key)
+
+    def load_index(self):
+        try:
+            with open(os.path.join(self.directory, INDEX_NAME)) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Drop entries whose files have gone missing
+        return {key: entry for key, entry in index.items() if os.path.exists(self.entry_path(key))}
+
+    def save_index(self):
+        write_atomic(os.path.join(self.directory, INDEX_NAME), json.dumps(self.index).encode("utf-8"))
+
+    def get(self, key):
+        """Returns the cached ASCII bytes for key, or None on a miss."""
+        with self.lock:
+            if key not in self.index:
+                self.misses += 1
+                return None
+            data = read_cache_entry(self.directory, key)
+            if data is None:
+                del self.index[key]
+                self.misses += 1
+                return None
+            self.index[key]["used"] = time.time()
+            self.hits += 1
+            self.dirty = True
+            return data
+
+    def record_lookup(self, key, hit):
+        """Counts a lookup another process made with read_cache_entry; a hit counts as a use of the entry."""
+        with self.lock:
+            if not hit:
+                self.misses += 1
+                return
+            self.hits += 1
+            if key not in self.index:
+                try:
+                    self.index[key] = {"size": os.path.getsize(self.entry_path(key))}
+                except OSError:
+                    return  # Evicted since it was read
+            self.index[key]["used"] = time.time()
+            self.dirty = True
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            write_atomic(self.entry_path(key), data)
+            self.index[key] = {"size": len(data), "used": time.time()}
+            self.evict()
+            self.save_index()
+            self.dirty = False
+
+    def flush(self):
+        """Writes the index if hits have changed it since the last put."""
+        with self.lock:
+            if self.dirty:
+                self.save_index()
+                self.dirty = False
+
+    def evict(self):
+        total = sum(entry["size"] for entry in self.index.values())
+        for key in sorted(self.index, key=lambda k: self.index[k]["used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self.index.pop(key)["size"]
+            self.evictions += 1
+            try:
+                os.remove(self.entry_path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups * 100 if lookups else 0.0
+        return f"Cache: {self.hits} hits, {self.misses} misses ({hit_rate:.0f}% hit rate), {self.evictions} evicted"
+
+
+# Write data to path via a temporary file and rename, so readers never see a partial file
+def write_atomic(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+# Store derived tables (glyph features, ramp tables) as one .npz file; an unwritable cache is
+# skipped, since it only costs computing them again next time
+def save_arrays(path, **arrays):
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, buffer.getvalue())
+    except OSError:
+        pass
+
+
+# The arrays save_arrays stored at path; raises OSError, ValueError or EOFError for a missing or broken
+# file and KeyError when a name is missing, all of which callers treat as a miss
+def load_arrays(path, *names):
+    with np.load(path) as stored:
+        return [stored[name] for name in names]
+
+
+# Convert an image through the cache, returning (ascii bytes, whether it was a hit)
+def cached_image_to_ascii(cache, image_path, new_width=None, new_height=None, mode="brightness", dither="none"):
+    key = cache_key(image_path, new_width, new_height, mode=mode, dither=dither)
+    data = cache.get(key)
+    if data is not None:
+        return data, True
+    data = image_to_ascii(image_path, new_width, new_height, mode=mode, dither=dither)
+    cache.put(key, data)
+    return data, False
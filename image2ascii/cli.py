@@ -0,0 +1,348 @@
+"""Headless batch conversion.
+
+Usage::
+
+    python -m image2ascii photos/ extra/*.png --width 120 --workers 8
+
+Never imports pyglet or tkinter, so it runs on servers without a display.
+
+All outputs go to one directory. Inputs that share a name stem, such as
+photo.png and photo.jpg or the same name in two subdirectories, get outputs
+named after their path instead (photo_png_ASCII.txt) rather than overwriting
+each other.
+"""
+import argparse
+import glob
+import hashlib
+import io
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PIL import Image
+
+from image2ascii.cache import DEFAULT_CACHE_BYTES, ResultCache, cache_key, file_digest, read_cache_entry
+from image2ascii.color import COLOR_FORMATS, color_output_path, image_to_color
+from image2ascii.core import ACCEPTED_FORMATS, ASCII_CHARS, MODES, ascii_output_path, image_to_ascii, ramp_lut
+from image2ascii.dither import DITHERS
+from image2ascii.frames import convert_frames_to_ascii, frame_sequence_path, is_multi_frame
+from image2ascii.instrument import NULL_INSTRUMENTATION, Instrumentation
+from image2ascii.packed import COMPRESSIONS, MAX_RAMP, decode_packed, packed_output_path, write_packed
+from image2ascii.ramps import PRESET_RAMPS, compile_ramp, resolve_ramp
+from image2ascii.renditions import render_renditions, rendition_output_path, resolve_sizes
+from image2ascii.shapes import check_glyph_chars
+from image2ascii.stream import STRIP_ROWS, convert_image_streaming, open_unlimited
+
+
+def has_accepted_extension(path):
+    return os.path.splitext(path)[1].lower().lstrip('.') in ACCEPTED_FORMATS
+
+
+# Expand files, globs and directories into a sorted, de-duplicated list of image paths
+def collect_inputs(inputs, recursive=False):
+    paths = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            if recursive:
+                candidates = [os.path.join(root, name)
+                              for root, _, names in os.walk(entry) for name in names]
+            else:
+                candidates = [os.path.join(entry, name) for name in os.listdir(entry)]
+            paths.extend(p for p in candidates if os.path.isfile(p) and has_accepted_extension(p))
+        elif os.path.isfile(entry):
+            paths.append(entry)
+        else:
+            paths.extend(p for p in glob.glob(entry, recursive=recursive)
+                         if os.path.isfile(p) and has_accepted_extension(p))
+
+    seen = set()
+    unique = []
+    for path in paths:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return sorted(unique)
+
+
+# Name the outputs of a list of inputs: every output lands in one directory, so inputs sharing a
+# stem (photo.png and photo.jpg, or photo.png in two subdirectories) are named after their path
+# below the directory they have in common instead, e.g. photo_png or a_photo_png. Returns
+# {input: path whose stem names its output}, or raises ValueError when names still clash.
+def output_names(paths):
+    by_stem = defaultdict(list)
+    for path in paths:
+        by_stem[os.path.normcase(os.path.splitext(os.path.basename(path))[0])].append(path)
+
+    names = {}
+    for group in by_stem.values():
+        if len(group) == 1:
+            names[group[0]] = group[0]
+            continue
+        common = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in group])
+        for path in group:
+            relative, extension = os.path.splitext(os.path.relpath(os.path.abspath(path), common))
+            flat = relative.replace(os.sep, "_") + extension.replace(".", "_")
+            names[path] = flat + extension
+
+    taken = defaultdict(list)
+    for path, name in names.items():
+        taken[os.path.normcase(os.path.splitext(os.path.basename(name))[0])].append(path)
+    clashes = [group for group in taken.values() if len(group) > 1]
+    if clashes:
+        raise ValueError("outputs would overwrite each other: " + "; ".join(", ".join(group) for group in clashes))
+    return names
+
+
+# Write a still image's ASCII as text, or packed when a compression name is given; returns the path.
+# source_digest is the SHA-256 of the image file recorded in packed files, computed here if not given.
+def write_output(image_path, ascii_bytes, output_dir=None, packed_compression=None, ascii_file_path=None,
+                 chars=ASCII_CHARS, output_name=None, source_digest=None):
+    if ascii_file_path is None:
+        ascii_file_path = ascii_output_path(output_name or image_path, output_dir)
+    if packed_compression is None:
+        with open(ascii_file_path, "w", encoding="utf-8") as f:
+            f.write(ascii_bytes.decode("utf-8"))
+        return ascii_file_path
+
+    packed_file_path = packed_output_path(ascii_file_path)
+    write_packed(packed_file_path, ascii_bytes, chars, compression=COMPRESSIONS[packed_compression],
+                 source_digest=source_digest or file_digest(image_path))
+    return packed_file_path
+
+
+# Worker entry point: convert one file and write its ASCII text. Returns (output, bytes written,
+# seconds, lookup), where lookup is (cache key, whether it was a hit) when cache_dir was given and
+# the file is a still image, else None. Hashing happens here rather than in the parent, and a hit is
+# read straight from its entry file; the parent, which owns the cache index, records the lookup.
+def convert_one(image_path, new_width=None, new_height=None, output_dir=None, strip_rows=None,
+                frame_files=False, timings_log=None, packed_compression=None, widths=None, map_workers=1,
+                mode="brightness", color_format=None, chars=ASCII_CHARS, dither="none", output_name=None,
+                cache_dir=None):
+    start = time.perf_counter()
+    # Output files are named after output_name (see output_names), the image is read from image_path
+    output_name = output_name or image_path
+    instrumentation = Instrumentation(log_path=timings_log) if timings_log else NULL_INSTRUMENTATION
+    source = image_path
+    if cache_dir is not None:
+        # Read the file once: the same bytes are hashed for the cache key and decoded
+        with open(image_path, "rb") as f:
+            source = io.BytesIO(f.read())
+    # Streaming bounds memory itself, so there sources over Pillow's pixel limit are accepted
+    image = open_unlimited(source)[0] if strip_rows else Image.open(source)
+    with image:
+        multi_frame = is_multi_frame(image)
+        source_size = image.size
+
+    lookup = None
+    if multi_frame:
+        # Every worker process already has a core to itself, so frames are mapped on one thread here
+        ascii_file_path = frame_sequence_path(output_name, output_dir, per_frame_files=frame_files)
+        convert_frames_to_ascii(image_path, ascii_file_path, new_width, new_height,
+                                max_workers=1, per_frame_files=frame_files, chars=chars, dither=dither)
+    elif strip_rows:
+        ascii_file_path = ascii_output_path(output_name, output_dir)
+        _, _, fallback = convert_image_streaming(image_path, ascii_file_path, new_width, new_height,
+                                                 strip_rows=strip_rows, chars=chars)
+        if fallback:
+            # Memory was not bounded by --strip-rows for this file, so say so next to it
+            size = os.path.getsize(ascii_file_path)
+            return f"{ascii_file_path} (not streamed: {fallback})", size, time.perf_counter() - start, None
+    elif color_format:
+        with instrumentation.run(image=image_path):
+            color_bytes = image_to_color(image_path, new_width, new_height, color_format, chars,
+                                         instrumentation=instrumentation, dither=dither)
+            with instrumentation.stage("write"):
+                ascii_file_path = color_output_path(output_name, color_format, output_dir)
+                with open(ascii_file_path, "wb") as f:
+                    f.write(color_bytes)
+        # Reported against the plain text of the same cells, one byte each plus a newline per row
+        columns, rows = resolve_sizes(source_size, [(new_width, new_height)])[0]
+        ratio = len(color_bytes) / (rows * (columns + 1))
+        return (f"{ascii_file_path} ({ratio:.1f}x plain text)", len(color_bytes), time.perf_counter() - start,
+                None)
+    elif widths:
+        # One decode for every width; the height, if given, limits all of them
+        with instrumentation.run(image=image_path):
+            with Image.open(image_path) as image:
+                renditions = render_renditions(image, [(width, new_height) for width in widths], ramp_lut(chars),
+                                               instrumentation=instrumentation)
+            with instrumentation.stage("write"):
+                digest = file_digest(image_path) if packed_compression else None
+                paths = [write_output(image_path, ascii_bytes, packed_compression=packed_compression,
+                                      ascii_file_path=rendition_output_path(output_name, width, output_dir),
+                                      chars=chars, source_digest=digest)
+                         for width, ascii_bytes in zip(widths, renditions)]
+        size = sum(os.path.getsize(path) for path in paths)
+        return ", ".join(paths), size, time.perf_counter() - start, None
+    else:
+        with instrumentation.run(image=image_path):
+            digest = ascii_bytes = None
+            if cache_dir is not None:
+                with instrumentation.stage("cache_lookup"):
+                    digest = hashlib.sha256(source.getbuffer()).hexdigest()
+                    key = cache_key(source, new_width, new_height, chars, mode, dither, digest=digest)
+                    ascii_bytes = read_cache_entry(cache_dir, key)
+                lookup = (key, ascii_bytes is not None)
+            if ascii_bytes is None:
+                ascii_bytes = image_to_ascii(source, new_width, new_height, instrumentation=instrumentation,
+                                             chars=chars, workers=map_workers, mode=mode, dither=dither)
+            with instrumentation.stage("write"):
+                ascii_file_path = write_output(image_path, ascii_bytes, output_dir, packed_compression,
+                                               chars=chars, output_name=output_name, source_digest=digest)
+
+    if os.path.isdir(ascii_file_path):
+        size = sum(entry.stat().st_size for entry in os.scandir(ascii_file_path))
+    else:
+        size = os.path.getsize(ascii_file_path)
+    return ascii_file_path, size, time.perf_counter() - start, lookup
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="image2ascii",
+                                     description="Convert images to ASCII art without opening a window.")
+    parser.add_argument("inputs", nargs="+", help="image files, glob patterns or directories")
+    parser.add_argument("-W", "--width", type=int, default=None, help="target width in characters")
+    parser.add_argument("-H", "--height", type=int, default=None, help="target height in characters")
+    parser.add_argument("-o", "--output-dir", default=None,
+                        help="directory for *_ASCII.txt files (default: current directory)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument("--mode", choices=MODES, default="brightness",
+                        help="pick characters by average brightness, or by matching glyph shapes so edges "
+                             "and lines keep their direction (animations always use brightness)")
+    parser.add_argument("--ramp", default=None,
+                        help=f"characters to draw with, ordered automatically by ink coverage, or a preset: "
+                             f"{', '.join(PRESET_RAMPS)} (default: {ASCII_CHARS.replace('%', '%%')!r} as given)")
+    parser.add_argument("--font", default=None,
+                        help="TrueType/OpenType font the ramp's ink coverage is measured in (default: Pillow's)")
+    parser.add_argument("--dither", choices=DITHERS, default="none",
+                        help="mix neighbouring ramp characters so gradients do not band at small widths: "
+                             "an ordered Bayer pattern, or Floyd-Steinberg error diffusion (default: %(default)s)")
+    parser.add_argument("--widths", type=int, nargs="+", default=None, metavar="WIDTH",
+                        help="write still images at each of these widths from a single decode "
+                             "(as NAME_ASCII_WIDTH.txt); --height limits all of them")
+    parser.add_argument("--stream", action="store_true",
+                        help="convert in horizontal strips to bound memory on very large images")
+    parser.add_argument("--strip-rows", type=int, default=STRIP_ROWS,
+                        help=f"source rows per strip when streaming (default: {STRIP_ROWS})")
+    parser.add_argument("--frame-files", action="store_true",
+                        help="write one file per frame for animated images instead of a frame sequence file")
+    parser.add_argument("--format", choices=["txt", "packed", *COLOR_FORMATS], default="txt",
+                        help="write still images as text, as compact packed .i2a files, or coloured as ANSI "
+                             "24-bit escapes (.ans) or HTML (.html) (default: txt)")
+    parser.add_argument("--compression", choices=list(COMPRESSIONS), default="zlib",
+                        help="compression of packed files (default: %(default)s)")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse previous conversions of identical files and settings")
+    parser.add_argument("--cache-dir", default=None, help="cache directory (default: ~/.cache/image2ascii)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_BYTES // (1024 * 1024),
+                        help="cache size cap in MB (default: %(default)s)")
+    parser.add_argument("--timings-log", default=None,
+                        help="append per-stage wall/CPU timings for each image to this JSON-lines file")
+    parser.add_argument("-r", "--recursive", action="store_true", help="descend into subdirectories")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print the summary")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.format == "packed" and args.stream:
+        parser.error("--format packed cannot be combined with --stream")
+    if args.widths and (args.stream or args.width):
+        parser.error("--widths cannot be combined with --stream or --width")
+    if args.mode == "shape" and (args.stream or args.widths):
+        parser.error("--mode shape cannot be combined with --stream or --widths")
+    if args.dither != "none" and (args.stream or args.widths or args.mode == "shape"):
+        parser.error("--dither cannot be combined with --stream, --widths or --mode shape")
+    if args.format in COLOR_FORMATS and (args.stream or args.widths or args.mode == "shape"):
+        parser.error(f"--format {args.format} cannot be combined with --stream, --widths or --mode shape")
+    packed_compression = args.compression if args.format == "packed" else None
+    color_format = args.format if args.format in COLOR_FORMATS else None
+
+    chars = ASCII_CHARS
+    if args.ramp:
+        try:
+            if args.mode == "shape":
+                # Shape matching picks glyphs by shape, so its set is used as given rather than by density
+                chars = resolve_ramp(args.ramp)
+                check_glyph_chars(chars)
+            else:
+                chars = compile_ramp(args.ramp, args.font)[0]
+        except (OSError, ValueError) as e:
+            parser.error(f"--ramp: {e}")
+    if not chars.isascii() and (packed_compression or color_format):
+        parser.error(f"--format {args.format} needs an ASCII ramp")
+    if packed_compression and len(chars) > MAX_RAMP:
+        parser.error(f"--format packed allows ramps of at most {MAX_RAMP} characters")
+
+    paths = collect_inputs(args.inputs, recursive=args.recursive)
+    if not paths:
+        print("No images found.", file=sys.stderr)
+        return 1
+    try:
+        names = output_names(paths)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    cache = ResultCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache else None
+    # Workers hash their own files and read hits from the entry files; only this process touches the index
+    cached = cache is not None and not args.stream and not args.widths and not color_format
+    cache_dir = cache.directory if cached else None
+
+    failures = 0
+    total_bytes = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        strip_rows = args.strip_rows if args.stream else None
+        # With fewer images than workers, the spare cores map row bands of each image in parallel
+        map_workers = max(1, args.workers // len(paths))
+        futures = {}
+        for path in paths:
+            future = executor.submit(convert_one, path, args.width, args.height, args.output_dir, strip_rows,
+                                     args.frame_files, args.timings_log, packed_compression, args.widths,
+                                     map_workers, args.mode, color_format, chars, args.dither, names[path],
+                                     cache_dir)
+            futures[future] = path
+
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                ascii_file_path, size, elapsed, lookup = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"FAILED {path}: {e}", file=sys.stderr)
+                continue
+            total_bytes += size
+            hit = False
+            if lookup is not None:
+                key, hit = lookup
+                cache.record_lookup(key, hit)
+                if not hit:
+                    # The cache always holds the text, whichever format was written
+                    if packed_compression is not None:
+                        cache.put(key, decode_packed(ascii_file_path))
+                    else:
+                        with open(ascii_file_path, "rb") as f:
+                            cache.put(key, f.read())
+            if not args.quiet:
+                print(f"{elapsed * 1000:8.1f} ms  {path} -> {ascii_file_path}{' (cached)' if hit else ''}")
+    if cache is not None:
+        cache.flush()
+    elapsed = time.perf_counter() - start
+
+    converted = len(paths) - failures
+    images_per_second = converted / elapsed if elapsed > 0 else 0.0
+    megabytes_per_second = total_bytes / elapsed / 1e6 if elapsed > 0 else 0.0
+    print(f"Converted {converted}/{len(paths)} images in {elapsed:.2f} s "
+          f"({images_per_second:.1f} images/s, {megabytes_per_second:.2f} MB/s of ASCII) "
+          f"using {args.workers} workers")
+    if cache is not None:
+        print(cache.stats())
+    return 1 if failures else 0
@@ -0,0 +1,224 @@
+"""Colour output: ANSI 24-bit escapes or HTML spans around the ASCII characters.
+
+Characters are picked from the grayscale image as usual, and every cell is
+coloured from the same resized RGB image. Colours are quantized to ``bits``
+per channel, and adjacent cells in a row with the same quantized colour share
+one escape or ``<span>``. Spaces show no colour, so they join whichever run
+they follow. Flat artwork then comes out a small multiple of the plain text
+size instead of the ~18x of one escape per cell; noisy photos gain less
+(``benchmarks/bench_color.py`` reports both).
+
+There is no Python loop over cells. The characters are looked up as one byte
+array, escaped for HTML through a padded table when the ramp needs it. Each
+run gets a prefix holding the previous run's close, a line end if the run
+starts a new row, and its own opening. All prefixes are built in fixed-width
+slots, filled column-wise from literal text and per-channel decimal or hex
+tables, then compacted with a boolean mask. A second mask, built with one
+``np.repeat``, interleaves the prefixes with the text of each run. The work
+is proportional to the cells plus the escape bytes actually written. Rows are
+processed in bands of ``COLOR_CHUNK_ROWS``.
+"""
+import os
+
+import numpy as np
+
+from image2ascii.core import ASCII_CHARS, ASCII_LUT, dither_for_ramp, grayscale_image, load_resized, ramp_lut
+from image2ascii.instrument import NULL_INSTRUMENTATION
+
+COLOR_FORMATS = ("ansi", "html")
+
+# Output file extension per colour format
+COLOR_EXTENSIONS = {"ansi": "ans", "html": "html"}
+
+# Bits kept per colour channel; fewer bits means longer runs and smaller output
+COLOR_BITS = 4
+
+# Rows assembled per band, bounding the slot and mask arrays
+COLOR_CHUNK_ROWS = 64
+
+HTML_HEADER = (b'<!DOCTYPE html>\n<html><head><meta charset="ascii"></head>\n'
+               b'<body style="background:#000"><pre style="font-family:monospace;line-height:1">\n')
+HTML_FOOTER = b"</pre></body></html>\n"
+
+HTML_ESCAPES = {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}
+
+
+# Byte strings as a zero-padded (count, longest) table plus the length of each
+def padded_table(values):
+    table = np.zeros((len(values), max(1, max(len(value) for value in values))), dtype=np.uint8)
+    for row, value in zip(table, values):
+        row[:len(value)] = np.frombuffer(value, dtype=np.uint8)
+    return table, np.array([len(value) for value in values], dtype=np.int64)
+
+
+# The used bytes of (count, width) slots, each holding lengths[i] bytes, in order
+def compact_slots(slots, lengths):
+    return slots[np.arange(slots.shape[1]) < lengths[:, None]]
+
+
+class ColorFormat:
+    """What one colour format writes to open and close runs, around each character and at line ends."""
+
+    def __init__(self, open_parts, close, line_end, glyphs, header=b"", footer=b""):
+        # Prefix parts are (condition, channel, padded table, lengths); open_parts items are literal
+        # bytes, or (channel, 256 byte strings indexed by that channel's value)
+        self.prefix_parts = [("follows_run", None) + padded_table([close]),
+                             ("starts_row", None) + padded_table([line_end])]
+        for part in open_parts:
+            if isinstance(part, bytes):
+                self.prefix_parts.append((None, None) + padded_table([part]))
+            else:
+                channel, values = part
+                self.prefix_parts.append((None, channel) + padded_table(values))
+        self.prefix_width = sum(table.shape[1] for _, _, table, _ in self.prefix_parts)
+        self.suffix = close + line_end
+        self.glyphs, self.glyph_lengths = padded_table(glyphs)
+        self.header = header
+        self.footer = footer
+
+    def prefixes(self, colors, starts_row):
+        """Prefix bytes of runs with the given (runs, 3) colours, and the length of each."""
+        runs = len(colors)
+        conditions = {"follows_run": np.arange(runs) > 0, "starts_row": starts_row & (np.arange(runs) > 0)}
+        slots = np.empty((runs, self.prefix_width), dtype=np.uint8)
+        used = np.empty((runs, self.prefix_width), dtype=bool)
+        lengths = np.zeros(runs, dtype=np.int64)
+        column = 0
+        for condition, channel, table, part_lengths in self.prefix_parts:
+            part_width = table.shape[1]
+            if channel is None:
+                slots[:, column:column + part_width] = table[0]
+                length = np.full(runs, part_lengths[0])
+            else:
+                slots[:, column:column + part_width] = table[colors[:, channel]]
+                length = part_lengths[colors[:, channel]]
+            if condition is not None:
+                length = np.where(conditions[condition], length, 0)
+            used[:, column:column + part_width] = np.arange(part_width) < length[:, None]
+            lengths += length
+            column += part_width
+        return slots[used], lengths
+
+    def text(self, codes):
+        """Bytes of a flat array of character codes, with each character's starting offset (plus the end)."""
+        if self.glyphs.shape[1] == 1:
+            return self.glyphs[codes, 0], np.arange(len(codes) + 1)
+        lengths = self.glyph_lengths[codes]
+        offsets = np.zeros(len(codes) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return compact_slots(self.glyphs[codes], lengths), offsets
+
+
+DECIMAL = [str(value).encode("ascii") for value in range(256)]
+HEX = [f"{value:02x}".encode("ascii") for value in range(256)]
+# One hex digit, exact for the multiples of 17 that 4-bit quantization produces
+SHORT_HEX = [f"{value // 17:x}".encode("ascii") for value in range(256)]
+PLAIN_GLYPHS = [bytes([value]) for value in range(256)]
+HTML_GLYPHS = [HTML_ESCAPES.get(chr(value), chr(value)).encode("latin-1") for value in range(256)]
+
+ANSI_FORMAT = ColorFormat([b"\x1b[38;2;", (0, DECIMAL), b";", (1, DECIMAL), b";", (2, DECIMAL), b"m"],
+                          close=b"", line_end=b"\x1b[0m\n", glyphs=PLAIN_GLYPHS)
+HTML_FORMAT = ColorFormat([b'<span style="color:#', (0, HEX), (1, HEX), (2, HEX), b'">'],
+                          close=b"</span>", line_end=b"\n", glyphs=HTML_GLYPHS,
+                          header=HTML_HEADER, footer=HTML_FOOTER)
+HTML_SHORT_FORMAT = ColorFormat([b'<span style="color:#', (0, SHORT_HEX), (1, SHORT_HEX), (2, SHORT_HEX), b'">'],
+                                close=b"</span>", line_end=b"\n", glyphs=HTML_GLYPHS,
+                                header=HTML_HEADER, footer=HTML_FOOTER)
+
+FORMATS = {"ansi": ANSI_FORMAT, "html": HTML_FORMAT}
+
+
+# The ColorFormat for a format name; HTML uses #rgb colours when they are exact
+def color_format_for(fmt, bits=COLOR_BITS):
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown colour format {fmt!r}, expected one of {', '.join(COLOR_FORMATS)}")
+    if fmt == "html" and bits == 4:
+        return HTML_SHORT_FORMAT
+    return FORMATS[fmt]
+
+
+# Quantize RGB to 2**bits evenly spaced levels per channel, from 0 to 255 inclusive
+def quantize_colors(rgb, bits=COLOR_BITS):
+    if bits >= 8:
+        return rgb
+    levels = (1 << bits) - 1
+    values = np.arange(256, dtype=np.int32)
+    table = ((values * levels + 127) // 255 * 255 // levels).astype(np.uint8)
+    return table[rgb]
+
+
+# Colour-coded rows for arrays of character codes (rows, columns) and colours (rows, columns, 3)
+def encode_color_rows(codes, rgb, fmt, coalesce=True):
+    height, width = codes.shape
+    run_start = np.ones((height, width), dtype=bool)
+    if coalesce:
+        # Spaces after the first column take the colour of the cell before them
+        columns = np.broadcast_to(np.arange(width), (height, width))
+        source = np.where((codes == ord(" ")) & (columns > 0), 0, columns)
+        rgb = np.take_along_axis(rgb, np.maximum.accumulate(source, axis=1)[..., None], axis=1)
+        run_start[:, 1:] = (rgb[:, 1:] != rgb[:, :-1]).any(axis=2)
+
+    text, offsets = fmt.text(codes.ravel())
+    starts = np.flatnonzero(run_start)
+    prefixes, prefix_lengths = fmt.prefixes(rgb.reshape(-1, 3)[starts], starts % width == 0)
+    text_lengths = np.diff(offsets[np.append(starts, height * width)])
+
+    # Output alternates prefix, run text, prefix, run text...; mark which bytes are prefix
+    lengths = np.empty(2 * len(starts), dtype=np.int64)
+    lengths[0::2] = prefix_lengths
+    lengths[1::2] = text_lengths
+    is_prefix = np.repeat(np.resize(np.array([True, False]), len(lengths)), lengths)
+    out = np.empty(len(is_prefix) + len(fmt.suffix), dtype=np.uint8)
+    out[:len(is_prefix)][is_prefix] = prefixes
+    out[:len(is_prefix)][~is_prefix] = text
+    out[len(is_prefix):] = np.frombuffer(fmt.suffix, dtype=np.uint8)
+    return out.tobytes()
+
+
+# Colour output for a grayscale array and an RGB array of the same size, in one of COLOR_FORMATS
+def render_color(pixels, rgb, fmt="ansi", lut=ASCII_LUT, bits=COLOR_BITS, coalesce=True,
+                 chunk_rows=COLOR_CHUNK_ROWS):
+    color_format = color_format_for(fmt, bits)
+    codes = lut[pixels]
+    rgb = quantize_colors(rgb, bits)
+    parts = [color_format.header]
+    for top in range(0, codes.shape[0], chunk_rows):
+        bottom = top + chunk_rows
+        parts.append(encode_color_rows(codes[top:bottom], rgb[top:bottom], color_format, coalesce))
+    parts.append(color_format.footer)
+    return b"".join(parts)
+
+
+# Convert an image file to colour output, returning the bytes
+def image_to_color(image_path, new_width=None, new_height=None, fmt="ansi", chars=ASCII_CHARS,
+                   bits=COLOR_BITS, instrumentation=NULL_INSTRUMENTATION, dither="none"):
+    from PIL import Image
+
+    color_format_for(fmt, bits)  # Fails on an unknown format or dither before the image is decoded
+    if dither != "none":
+        from image2ascii.dither import check_dither
+        check_dither(dither)
+    lut = ramp_lut(chars)
+    if lut.dtype != np.uint8:
+        raise ValueError("colour output needs an ASCII ramp")
+    with Image.open(image_path) as image:
+        image = load_resized(image, new_width, new_height, instrumentation=instrumentation)
+    with instrumentation.stage("grayscale"):
+        pixels = np.array(grayscale_image(image))
+        rgb = np.array(image.convert("RGB"))
+    if dither != "none":
+        # Only the characters are dithered; each cell keeps its own colour
+        with instrumentation.stage("dither"):
+            pixels = dither_for_ramp(pixels, chars, dither)
+
+    with instrumentation.stage("map"):
+        return render_color(pixels, rgb, fmt, lut, bits)
+
+
+# Output file name for colour output, e.g. photo_ASCII.ans or photo_ASCII.html
+def color_output_path(image_path, fmt, output_dir=None):
+    file_name, _ = os.path.splitext(os.path.basename(image_path))
+    color_file_path = f"{file_name}_ASCII.{COLOR_EXTENSIONS[fmt]}"
+    if output_dir:
+        color_file_path = os.path.join(output_dir, color_file_path)
+    return color_file_path
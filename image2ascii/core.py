@@ -0,0 +1,284 @@
+"""Conversion core for Image2ASCII.
+
+Everything here is GUI-free so it can be used from the window, the command
+line and worker processes alike. Pillow and the thread pool are imported by
+the functions that need them rather than at module level, so importing the
+core (for the ramp, the lookup table or ``render_ascii`` on arrays) only pays
+for NumPy.
+"""
+import functools
+import os
+import threading
+
+import numpy as np
+
+from image2ascii.instrument import NULL_INSTRUMENTATION
+
+# Set accepted image formats
+ACCEPTED_FORMATS = ['png', 'jpg', 'jpeg', 'bmp', 'gif', 'tiff', 'webp']
+
+# Define the ASCII characters based on intensity
+ASCII_CHARS = "@%#*+=-:. "
+
+# ASCII characters are roughly this many times taller than they are wide
+RATIO_ADJUSTMENT_NUM = 2.8
+
+# Ways of picking each character: by average brightness, or by glyph shape (see image2ascii.shapes)
+MODES = ("brightness", "shape")
+
+
+# Work out the output size for an image, maintaining aspect ratio within the given width and height
+def resolve_dimensions(original_size, new_width=None, new_height=None):
+    original_width, original_height = original_size
+    aspect_ratio = original_height / original_width
+
+    # ASCII characters are roughly twice as tall as they are wide, so we adjust the aspect ratio
+    aspect_ratio_adjustment = RATIO_ADJUSTMENT_NUM
+
+    # If both width and height are given, adjust the height based on width to maintain aspect ratio
+    if new_width and new_height:
+        target_height = int(new_width * aspect_ratio / aspect_ratio_adjustment)
+        if target_height > new_height:
+            new_width = int(new_height * aspect_ratio_adjustment / aspect_ratio)
+        else:
+            new_height = target_height
+    # If only the width is given, calculate the height
+    elif new_width:
+        new_height = int(new_width * aspect_ratio / aspect_ratio_adjustment)
+    # If only the height is given, calculate the width
+    elif new_height:
+        new_width = int(new_height * aspect_ratio_adjustment / aspect_ratio)
+
+    return new_width, new_height
+
+
+# Output size for an image of original_size: a missing dimension means the original one, and a very
+# wide or tall target that rounds a dimension down to zero still keeps at least one character
+def output_size(original_size, new_width=None, new_height=None):
+    if new_width is None:
+        new_width = original_size[0]
+    if new_height is None:
+        new_height = original_size[1]
+    width, height = resolve_dimensions(original_size, new_width, new_height)
+    return max(1, width), max(1, height)
+
+
+# Resize the image, ensuring it fits within the given width and height while maintaining aspect ratio
+def resize_image(image, new_width=None, new_height=None):
+    # Resize the image to the new dimensions
+    return image.resize(output_size(image.size, new_width, new_height))
+
+
+# Decode at least this many times the output size before the final resample, so quality holds up
+DECODE_OVERSAMPLE = 2
+
+
+# Integer factor reduce() can shrink a decode of the given size by while staying oversample times
+# above the output size; 1 where reduce() does not apply (bilevel and palette images)
+def reduce_factor(decoded_size, size, mode, oversample=DECODE_OVERSAMPLE):
+    if mode in ("1", "P"):
+        return 1
+    factor = min(int(decoded_size[0] // (size[0] * oversample)), int(decoded_size[1] // (size[1] * oversample)))
+    return max(1, factor)
+
+
+# Decode an opened (not yet loaded) image close to the given output size, returning it with the
+# box of the decoded image that covers the whole source. JPEGs use DCT scaling through draft(),
+# then reduce() box-averages anything still much larger than needed; oversample is how many
+# times the output size the decode is kept above. With max_pixels set, a decode larger than that
+# raises DecompressionBombError before any memory is allocated for it.
+def decode_for_size(image, size, oversample=DECODE_OVERSAMPLE, max_pixels=None):
+    width, height = size
+    box = (0, 0) + image.size
+
+    # Only JPEG implements draft(); it returns None when no scaling applies
+    draft = image.draft(None, (width * oversample, height * oversample))
+    if draft is not None:
+        box = draft[1]
+    if max_pixels is not None and image.size[0] * image.size[1] > max_pixels:
+        from PIL import Image
+        raise Image.DecompressionBombError(
+            f"decoding {image.size[0]}x{image.size[1]} exceeds the limit of {max_pixels} pixels")
+    image.load()
+
+    factor = reduce_factor(box[2:], size, image.mode, oversample)
+    if factor >= 2:
+        image = image.reduce(factor)
+        box = (0, 0, box[2] / factor, box[3] / factor)
+    return image, box
+
+
+# Decode and resize an opened image for ASCII output, decoding at reduced resolution where possible
+def load_resized(image, new_width=None, new_height=None, instrumentation=NULL_INSTRUMENTATION):
+    size = output_size(image.size, new_width, new_height)
+
+    with instrumentation.stage("decode"):
+        decoded, box = decode_for_size(image, size)
+    with instrumentation.stage("resize"):
+        return decoded.resize(size, box=box)
+
+
+# Convert image to grayscale, and handle transparency
+def grayscale_image(image):
+    if image.mode in ('RGBA', 'LA'):  # Handle images with transparency
+        grayscale_image = image.convert("L")  # Convert to grayscale
+        alpha = image.getchannel('A')  # Get the alpha channel
+
+        np_grayscale = np.array(grayscale_image)
+        np_alpha = np.array(alpha)
+
+        # Make transparent pixels white
+        np_grayscale[np_alpha == 0] = 255
+        from PIL import Image
+        return Image.fromarray(np_grayscale)
+
+    return image.convert("L")  # Convert to grayscale
+
+
+# Ramps need at least a dark and a light character, and every character needs a grayscale value
+MIN_RAMP_CHARS = 2
+MAX_RAMP_CHARS = 256
+
+
+# Build a 256-entry lookup table mapping every grayscale value to a ramp character, densest first.
+# The default ramp keeps its original table (bands of 32 over its first eight characters, pure white
+# blank), so default output never changes. Any other ramp splits the 256 values into equal bands,
+# one per character. ASCII ramps map to bytes; any other ramp maps to UCS-4 code points, which
+# render_ascii encodes as UTF-8.
+def build_ascii_lut(chars=ASCII_CHARS):
+    if not MIN_RAMP_CHARS <= len(chars) <= MAX_RAMP_CHARS:
+        raise ValueError(f"ramp needs {MIN_RAMP_CHARS} to {MAX_RAMP_CHARS} characters, got {len(chars)}")
+    if chars.isascii():
+        ramp = np.frombuffer(chars.encode("ascii"), dtype=np.uint8)
+    else:
+        ramp = np.array([ord(c) for c in chars], dtype=np.uint32)
+    if chars == ASCII_CHARS:
+        lut = ramp[np.arange(256) // 32]
+        lut[255] = ord(' ')  # Pure white is always blank
+        return lut
+    return ramp[np.arange(256) * len(ramp) // 256]
+
+
+# Lookup table for a ramp, built once per process; the table is shared, so it is read-only
+@functools.lru_cache(maxsize=64)
+def ramp_lut(chars=ASCII_CHARS):
+    lut = build_ascii_lut(chars)
+    lut.flags.writeable = False
+    return lut
+
+
+ASCII_LUT = ramp_lut()
+
+# Number of rows mapped per chunk between progress updates
+RENDER_CHUNK_ROWS = 64
+
+# Bands smaller than this are not worth handing to another thread
+PARALLEL_MIN_ROWS = 256
+
+
+# Split height rows into at most count bands of whole chunks, returning (start, stop) pairs
+def row_bands(height, count, chunk_rows=RENDER_CHUNK_ROWS, min_rows=PARALLEL_MIN_ROWS):
+    count = max(1, min(count, height // min_rows))
+    band_rows = -(-height // count)
+    band_rows = -(-band_rows // chunk_rows) * chunk_rows
+    return [(start, min(start + band_rows, height)) for start in range(0, height, band_rows)]
+
+
+# Map rows start to stop of pixels into out, calling report(rows) after each chunk
+def map_rows(pixels, lut, out, start, stop, chunk_rows, report=None):
+    width = pixels.shape[1]
+    for chunk_start in range(start, stop, chunk_rows):
+        chunk_stop = min(chunk_start + chunk_rows, stop)
+        np.take(lut, pixels[chunk_start:chunk_stop], out=out[chunk_start:chunk_stop, :width])
+        if report is not None:
+            report(chunk_stop - chunk_start)
+
+
+# Map a 2D grayscale array to newline-terminated ASCII rows in one contiguous byte buffer (UTF-8
+# for non-ASCII ramps). With workers > 1, row bands are mapped on a thread pool (np.take releases
+# the GIL) straight into their place in the buffer. progress(rows) gets the total rows mapped so far.
+def render_ascii(pixels, lut=ASCII_LUT, progress=None, chunk_rows=RENDER_CHUNK_ROWS, workers=1):
+    height, width = pixels.shape
+    out = np.empty((height, width + 1), dtype=lut.dtype)
+    out[:, width] = ord('\n')
+
+    bands = row_bands(height, workers, chunk_rows)
+    rows_done = 0
+    lock = threading.Lock()
+
+    def report(rows):
+        nonlocal rows_done
+        # Held while calling progress so the reported counts only ever increase
+        with lock:
+            rows_done += rows
+            progress(rows_done)
+
+    report = report if progress is not None else None
+    if len(bands) == 1:
+        map_rows(pixels, lut, out, 0, height, chunk_rows, report)
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=len(bands)) as executor:
+            futures = [executor.submit(map_rows, pixels, lut, out, start, stop, chunk_rows, report)
+                       for start, stop in bands]
+            for future in futures:
+                future.result()  # Re-raises anything a band raised, e.g. a cancelled job
+
+    if lut.dtype != np.uint8:
+        return out.astype("<u4", copy=False).tobytes().decode("utf-32-le").encode("utf-8")
+    return out.tobytes()
+
+
+# Map the grayscale pixel values to ASCII characters
+def pixel_to_ascii(image):
+    return render_ascii(np.array(image)).decode("utf-8")
+
+
+# Dither a grayscale array for a ramp with one of image2ascii.dither.DITHERS; "none" imports nothing
+def dither_for_ramp(pixels, chars=ASCII_CHARS, dither="none"):
+    if dither == "none":
+        return pixels
+    from image2ascii.dither import dither_pixels, table_levels
+    values = table_levels(ramp_lut(chars))
+    return dither_pixels(pixels, len(values), dither, values)
+
+
+# Open, resize, grayscale and map an image file (a path or binary file object), returning the ASCII bytes
+def image_to_ascii(image_path, new_width=None, new_height=None, instrumentation=NULL_INSTRUMENTATION,
+                   chars=ASCII_CHARS, workers=1, mode="brightness", dither="none"):
+    from PIL import Image
+
+    if dither != "none":
+        from image2ascii.dither import check_dither
+        check_dither(dither, mode)
+    if mode == "shape":
+        from image2ascii.shapes import SHAPE_CHARS, glyph_set, shape_image_to_ascii
+
+        # The brightness ramp is too small a glyph set to match shapes against, so it means the default set
+        glyphs = glyph_set(SHAPE_CHARS if chars == ASCII_CHARS else chars)
+        with Image.open(image_path) as image:
+            return shape_image_to_ascii(image, new_width, new_height, glyphs, instrumentation=instrumentation)
+    if mode != "brightness":
+        raise ValueError(f"unknown mode {mode!r}, expected one of {', '.join(MODES)}")
+
+    lut = ramp_lut(chars)
+    with Image.open(image_path) as image:
+        image = load_resized(image, new_width, new_height, instrumentation=instrumentation)
+    with instrumentation.stage("grayscale"):
+        pixels = np.array(grayscale_image(image))
+    if dither != "none":
+        with instrumentation.stage("dither"):
+            pixels = dither_for_ramp(pixels, chars, dither)
+
+    with instrumentation.stage("map"):
+        return render_ascii(pixels, lut, workers=workers)
+
+
+# Output file name used for a converted image, matching the GUI's naming
+def ascii_output_path(image_path, output_dir=None):
+    file_name, _ = os.path.splitext(os.path.basename(image_path))
+    ascii_file_path = f"{file_name}_ASCII.txt"
+    if output_dir:
+        ascii_file_path = os.path.join(output_dir, ascii_file_path)
+    return ascii_file_path
@@ -0,0 +1,127 @@
+"""Dithering of grayscale arrays before they are mapped to ramp characters.
+
+A ramp of n characters can only show n gray levels, so at small widths smooth
+gradients come out as flat bands. Dithering picks between the two nearest
+levels from cell to cell so that areas average out to their true brightness.
+There is one level per character the lookup table can produce, spaced evenly
+from 0 (the densest) to 255 (the lightest). The result is still a grayscale
+array, with every cell moved to the first value of its chosen character's
+band in that table, so ``render_ascii`` and every ramp table work unchanged.
+
+``bayer`` adds a fixed 8x8 threshold pattern. It needs no state, so it is a
+single gather from a (thresholds, 256) table: the same as another lookup
+table. ``floyd-steinberg`` spreads each cell's rounding error onto the cells
+to its right and below. The cell to the right depends on its left neighbour,
+so one row cannot be done in a single array operation. Instead all rows
+advance together, each two columns behind the row above, which is when all
+of a cell's inputs from that row are final. The image is stored skewed, so
+one step is one contiguous column of cells across every row. Each cell pulls
+its four error shares from the cells handled in the last three steps, so a
+step is a handful of array operations, and the Python loop runs
+width + 2 * height times rather than once per cell.
+``benchmarks/bench_dither.py`` compares both with plain conversion.
+"""
+import functools
+
+import numpy as np
+
+DITHERS = ("none", "bayer", "floyd-steinberg")
+
+# Side of the Bayer threshold matrix; 64 distinct thresholds are plenty between two ramp levels
+BAYER_SIZE = 8
+
+# Floyd-Steinberg error shares a cell receives: from its left neighbour, and from above-left, above
+# and above-right (as seen from the neighbour, to its right and to below-right, below and below-left)
+FS_LEFT = np.float32(7 / 16)
+FS_ABOVE_SHARES = np.array([1 / 16, 5 / 16, 3 / 16], dtype=np.float32)
+
+
+# Bayer index matrix of the given power-of-two size, holding 0 to size**2 - 1
+def bayer_matrix(size=BAYER_SIZE):
+    matrix = np.zeros((1, 1), dtype=np.intp)
+    while matrix.shape[0] < size:
+        matrix = np.block([[4 * matrix, 4 * matrix + 2], [4 * matrix + 3, 4 * matrix + 1]])
+    return matrix
+
+
+# Grayscale value standing for each of levels equal bands: the first value of its band in build_ascii_lut
+def level_values(levels):
+    return ((256 * np.arange(levels) + levels - 1) // levels).astype(np.uint8)
+
+
+# Grayscale value standing for each character a lookup table produces: the first value of its band
+def table_levels(lut):
+    return np.flatnonzero(np.concatenate(([True], lut[1:] != lut[:-1]))).astype(np.uint8)
+
+
+# For each Bayer threshold, the output value of every input value; values is a tuple, one per level
+@functools.lru_cache(maxsize=16)
+def bayer_table(values, size=BAYER_SIZE):
+    levels = len(values)
+    thresholds = (np.arange(size * size) + 0.5) / (size * size)
+    scaled = np.arange(256) * (levels - 1) / 255
+    chosen = np.minimum((scaled[None, :] + thresholds[:, None]).astype(np.intp), levels - 1)
+    table = np.array(values, dtype=np.uint8)[chosen]
+    table.flags.writeable = False
+    return table
+
+
+# Ordered dithering of a 2D uint8 array to the gray levels output as values
+def bayer_dither(pixels, values, size=BAYER_SIZE):
+    height, width = pixels.shape
+    matrix = bayer_matrix(size)
+    # Threshold index of every cell, tiled from the matrix without a per-cell loop
+    index = np.tile(matrix, (-(-height // size), -(-width // size)))[:height, :width]
+    return bayer_table(tuple(values.tolist()), size)[index, pixels]
+
+
+# Floyd-Steinberg error diffusion of a 2D uint8 array to the gray levels output as values
+def floyd_steinberg_dither(pixels, values):
+    levels = len(values)
+    height, width = pixels.shape
+    steps = width + 2 * (height - 1)
+    # Cell (y, x) is handled at step x + 2 * y. Its error is stored at error[step + 3, y + 1], so the
+    # three leading steps and the leading row are zeros standing in for neighbours off the image.
+    rows = np.arange(height)
+    skew = np.arange(width)[None, :] + 2 * rows[:, None]
+    source = np.zeros((steps, height), dtype=np.float32)
+    # Work in level units, so rounding picks the level and the error needs no rescaling
+    source[skew, rows[:, None]] = pixels * np.float32((levels - 1) / 255)
+    error = np.zeros((steps + 3, height + 1), dtype=np.float32)
+    chosen = np.zeros((steps, height), dtype=np.float32)
+
+    for step in range(steps):
+        # Rows whose cell at this step is inside the image
+        top = max(0, (step - width) // 2 + 1)
+        bottom = min(height, step // 2 + 1)
+        # Above-right, above and above-left were handled one, two and three steps ago, on the row above
+        wanted = FS_ABOVE_SHARES @ error[step:step + 3, top:bottom]
+        wanted += error[step + 2, top + 1:bottom + 1] * FS_LEFT
+        wanted += source[step, top:bottom]
+        level = chosen[step, top:bottom]
+        np.rint(wanted, out=level)
+        np.maximum(level, 0, out=level)
+        np.minimum(level, levels - 1, out=level)
+        np.subtract(wanted, level, out=error[step + 3, top + 1:bottom + 1])
+    return values[chosen[skew, rows[:, None]].astype(np.intp)]
+
+
+# Reject an unknown dither, or one combined with shape matching, which picks glyphs by shape instead
+def check_dither(method, mode="brightness"):
+    if method not in DITHERS:
+        raise ValueError(f"unknown dither {method!r}, expected one of {', '.join(DITHERS)}")
+    if method != "none" and mode == "shape":
+        raise ValueError("dithering only applies to brightness mode")
+
+
+# Dither a 2D uint8 grayscale array to levels gray levels with one of DITHERS. values holds the
+# grayscale value output for each level (see table_levels); by default the levels are equal bands.
+def dither_pixels(pixels, levels, method="none", values=None):
+    check_dither(method)
+    if method == "none" or pixels.size == 0:
+        return pixels
+    if values is None:
+        values = level_values(levels)
+    if method == "bayer":
+        return bayer_dither(pixels, values)
+    return floyd_steinberg_dither(pixels, values)
@@ -0,0 +1,160 @@
+"""Multi-frame (animated GIF/WebP, multi-page TIFF) conversion.
+
+Frames are decoded one at a time with ``ImageSequence``, downscaled and
+grayscaled immediately, and mapped on a thread pool. Only the small grayscale
+arrays of frames still being mapped are kept, so memory does not grow with the
+number of frames. A frame whose downscaled grayscale matches the previous
+frame is skipped and its duration added to the previous one.
+
+A frame sequence file looks like::
+
+    Image2ASCII frames <count> <width>x<height>
+    frame <index> <duration in ms>
+    <height rows of ASCII>
+    frame <index> <duration in ms>
+    ...
+"""
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+from image2ascii.core import ASCII_CHARS, dither_for_ramp, grayscale_image, output_size, ramp_lut, render_ascii
+
+FRAME_SEQUENCE_MAGIC = "Image2ASCII frames"
+
+# Duration used when a frame does not specify one (ms)
+DEFAULT_FRAME_DURATION = 100
+
+# Name of the index file written alongside per-frame files
+FRAME_INDEX_NAME = "frames.txt"
+
+
+def is_multi_frame(image):
+    return getattr(image, "n_frames", 1) > 1
+
+
+# Output path for a frame sequence: a single file, or a directory when writing one file per frame
+def frame_sequence_path(image_path, output_dir=None, per_frame_files=False):
+    file_name, _ = os.path.splitext(os.path.basename(image_path))
+    path = f"{file_name}_ASCII_frames" if per_frame_files else f"{file_name}_ASCII_frames.txt"
+    if output_dir:
+        path = os.path.join(output_dir, path)
+    return path
+
+
+# Decode frames one by one, yielding each as a downscaled grayscale array with its duration
+def iter_grayscale_frames(image, new_width=None, new_height=None):
+    size = output_size(image.size, new_width, new_height)
+    for frame in ImageSequence.Iterator(image):
+        duration = frame.info.get("duration") or DEFAULT_FRAME_DURATION
+        pixels = np.array(grayscale_image(frame.resize(size)))
+        yield pixels, duration
+
+
+class FrameSequenceWriter:
+    """Writes mapped frames either to one sequence file or to one file per frame."""
+
+    def __init__(self, output_path, per_frame_files=False):
+        self.output_path = output_path
+        self.per_frame_files = per_frame_files
+        self.count = 0
+        self.shape = (0, 0)
+        if per_frame_files:
+            os.makedirs(output_path, exist_ok=True)
+            self.f = open(os.path.join(output_path, FRAME_INDEX_NAME), "w")
+        else:
+            self.f = open(output_path, "w", encoding="utf-8")
+            self.write_header()
+
+    def write_header(self):
+        # Fields are padded to a fixed width so the header can be rewritten in place on close
+        height, width = self.shape
+        self.f.write(f"{FRAME_SEQUENCE_MAGIC} {self.count:10d} {width:>6}x{height:<6}\n")
+
+    def write(self, ascii_bytes, duration, shape):
+        self.shape = shape
+        if self.per_frame_files:
+            frame_name = f"frame_{self.count:05d}.txt"
+            with open(os.path.join(self.output_path, frame_name), "w", encoding="utf-8") as f:
+                f.write(ascii_bytes.decode("utf-8"))
+            self.f.write(f"{frame_name} {duration}\n")
+        else:
+            self.f.write(f"frame {self.count} {duration}\n")
+            self.f.write(ascii_bytes.decode("utf-8"))
+        self.count += 1
+
+    def close(self):
+        if not self.per_frame_files:
+            self.f.seek(0)
+            self.write_header()
+        self.f.close()
+
+
+# Convert every frame of an image, writing a frame sequence; returns (frames written, frames skipped)
+def convert_frames_to_ascii(image_path, output_path, new_width=None, new_height=None,
+                            max_workers=None, per_frame_files=False, progress=None, chars=ASCII_CHARS,
+                            dither="none"):
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = max_workers * 2
+    lut = ramp_lut(chars)
+
+    # Dithered on the worker too; duplicates are detected on the undithered frames before this
+    def render_frame(pixels):
+        return render_ascii(dither_for_ramp(pixels, chars, dither), lut)
+
+    writer = FrameSequenceWriter(output_path, per_frame_files=per_frame_files)
+    pending = deque()  # [future, duration, shape] in frame order
+    previous = None
+    decoded = 0
+    skipped = 0
+
+    def flush(keep):
+        while len(pending) > keep:
+            future, duration, shape = pending.popleft()
+            writer.write(future.result(), duration, shape)
+
+    try:
+        with Image.open(image_path) as image, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for pixels, duration in iter_grayscale_frames(image, new_width, new_height):
+                decoded += 1
+                if previous is not None and np.array_equal(pixels, previous):
+                    # Identical after downscaling: hold the previous frame for longer instead
+                    pending[-1][1] += duration
+                    skipped += 1
+                else:
+                    pending.append([executor.submit(render_frame, pixels), duration, pixels.shape])
+                    previous = pixels
+                    # Keep the newest frame pending so later duplicates can extend it
+                    flush(max_in_flight)
+
+                if progress is not None:
+                    progress(decoded)
+            flush(0)
+    finally:
+        writer.close()
+
+    return writer.count, skipped
+
+
+# Read a frame sequence written by convert_frames_to_ascii, yielding (duration, text) per frame
+def read_frame_sequence(path):
+    if os.path.isdir(path):
+        with open(os.path.join(path, FRAME_INDEX_NAME)) as index:
+            for line in index:
+                frame_name, duration = line.split()
+                with open(os.path.join(path, frame_name), encoding="utf-8") as f:
+                    yield int(duration), f.read()
+        return
+
+    with open(path, encoding="utf-8") as f:
+        magic = f.readline()
+        if not magic.startswith(FRAME_SEQUENCE_MAGIC):
+            raise ValueError(f"{path} is not an Image2ASCII frame sequence")
+        count, size = magic[len(FRAME_SEQUENCE_MAGIC):].split()
+        height = int(size.split("x")[1])
+        for _ in range(int(count)):
+            _, _, duration = f.readline().split()
+            yield int(duration), "".join(f.readline() for _ in range(height))
@@ -0,0 +1,651 @@
+"""The Image2ASCII window.
+
+Importing this module loads pyglet; tkinter is only loaded when the file
+dialog is first opened. Run with ``python -m image2ascii.gui`` or through the
+``Image2ASCII 009.py`` launcher.
+
+Set ``IMAGE2ASCII_DITHER`` to ``bayer`` or ``floyd-steinberg`` to dither still
+images and frames before mapping; several widths at once are never dithered.
+"""
+import pyglet
+from pyglet.window import key, mouse
+import os
+import hashlib
+import io
+
+import numpy as np
+from PIL import Image
+import subprocess
+import threading
+
+from image2ascii.core import dither_for_ramp, grayscale_image, load_resized, render_ascii
+from image2ascii.cache import ResultCache, cache_key
+from image2ascii.dither import check_dither
+from image2ascii.frames import convert_frames_to_ascii, frame_sequence_path, is_multi_frame
+from image2ascii.instrument import Instrumentation, format_event
+from image2ascii.jobs import JobQueue, QueueFull
+from image2ascii.preview import GlyphAtlas, PreviewPyramid
+from image2ascii.renditions import render_renditions, rendition_output_path
+
+# IMAGE2ASCII 009
+
+# Constants for GitHub label
+GITHUB_FONT_SIZE = 10  # Font size for the GitHub link text
+GITHUB_TRANSPARENCY = 145  # Transparency (out of 255, semi-transparent)
+
+# Live preview area, drawn in place of the prompt and Browse button while dimensions are typed
+PREVIEW_MARGIN = 10  # Gap to the window edges
+PREVIEW_BOTTOM = 150  # Keeps the console lines below the preview visible
+
+# Background conversions
+JOB_WORKERS = 2  # Images converted at the same time
+MAX_QUEUED_JOBS = 32  # Further images are refused until the queue drains
+# Threads mapping row bands of one large image; the job workers split one budget of cores between them
+MAP_WORKERS = max(1, (os.cpu_count() or 1) // JOB_WORKERS)
+
+
+class ImageApp(pyglet.window.Window):
+    def __init__(self):
+        super().__init__(width=800, height=375, caption="Image2ASCII", resizable=False, file_drops=True)
+
+        # UI components
+        self.prompt_label = pyglet.text.Label('Submit an image to convert to ASCII art!',
+                                              font_name='Arial', font_size=14,
+                                              x=self.width // 2, y=self.height // 2 + 100, anchor_x='center')
+        self.browse_button = pyglet.shapes.Rectangle(self.width // 2 - 60, self.height // 2, 120, 40,
+                                                     color=(50, 100, 150))  # Default button color
+        self.browse_text = pyglet.text.Label('Browse', font_name='Arial', font_size=16,
+                                             x=self.width // 2, y=self.height // 2 + 20, anchor_x='center',
+                                             anchor_y='center', color=(255, 255, 255, 255))  # Default white text
+
+        # Console for message output
+        self.console_messages = []
+        self.console_labels = []
+        self.max_console_lines = 5  # Maximum number of lines to show
+        # Job whose progress line was the last one added, set as each line is added rather than when it is drawn
+        self.console_progress_job = None
+
+        # Track hover state for the button
+        self.is_hovering_button = False
+
+        # GitHub link at the bottom-left corner
+        self.github_label = pyglet.text.Label('https://github.com/Fklyf/Image2ASCII',
+                                              font_name='Arial', font_size=10,
+                                              x=10, y=10, anchor_x='left', color=(255, 255, 255, 145))
+
+        # Variables for user input and state
+        self.image_path = None
+        self.pending_paths = []  # Images waiting for their dimensions to be entered
+        self.source_images = {}  # Opened by is_image and reused for the conversion
+        self.source_bytes = {}  # File contents read by is_image, for hashing and reopening without the file
+        self.awaiting_input = False
+        self.rendition_widths = None  # Set when several widths are entered at once
+
+        # Conversions run on a small pool of worker threads that report back through events
+        self.job_queue = JobQueue(self.run_job, on_event=self.on_job_event,
+                                  max_workers=JOB_WORKERS, max_queued=MAX_QUEUED_JOBS)
+
+        # Dithering before mapping: none, bayer or floyd-steinberg
+        self.dither = os.environ.get("IMAGE2ASCII_DITHER") or "none"
+        check_dither(self.dither)
+
+        # On-disk cache of previous conversions, keyed on file contents and settings
+        self.result_cache = ResultCache()
+
+        # Live preview: a downsample pyramid per image and a glyph atlas drawn as one sprite
+        self.preview_batch = pyglet.graphics.Batch()
+        self.preview_sprite = None
+        self.preview_pyramid = None
+        self.glyph_atlas = GlyphAtlas()
+
+        # Per-stage timings, configured through IMAGE2ASCII_* environment variables
+        self.instrumentation = Instrumentation.from_env()
+        if self.instrumentation.enabled:
+            self.instrumentation.subscribe(self.report_stage)
+
+    def brighten_color(self, color, percentage):
+        """Brightens the RGB color by a given percentage."""
+        return tuple(min(int(c + c * percentage), 255) for c in color)
+
+    def on_draw(self):
+        self.clear()
+
+        # Check if we are hovering over the button
+        if self.is_hovering_button:
+            brightened_color = self.brighten_color(self.browse_button.color, 0.3)  # Brighten by 30%
+            self.browse_button.color = brightened_color
+            self.browse_text.color = (0, 0, 0, 255)  # Change text to black
+        else:
+            self.browse_button.color = (50, 100, 150)  # Revert button to original color
+            self.browse_text.color = (255, 255, 255, 255)  # Revert text to white
+
+        # Draw the labels and buttons, or the live preview in their place while it is shown
+        if self.preview_sprite is not None:
+            self.preview_batch.draw()
+        else:
+            self.prompt_label.draw()
+            self.browse_button.draw()
+            self.browse_text.draw()
+        self.github_label.draw()
+
+        # Draw console messages
+        for label in self.console_labels:
+            label.draw()
+
+    def on_mouse_motion(self, x, y, dx, dy):
+        """Handles mouse movement to detect if it's hovering over the button."""
+        if self.browse_button.x < x < self.browse_button.x + self.browse_button.width and \
+                self.browse_button.y < y < self.browse_button.y + self.browse_button.height:
+            self.is_hovering_button = True
+        else:
+            self.is_hovering_button = False
+
+    def on_mouse_press(self, x, y, button, modifiers):
+        # Check if the user clicked the "Browse" button
+        if self.browse_button.x < x < self.browse_button.x + self.browse_button.width and \
+                self.browse_button.y < y < self.browse_button.y + self.browse_button.height:
+            # Open file dialog when the "Browse" button is clicked
+            threading.Thread(target=self.select_image).start()
+
+        # Check if the GitHub label is clicked
+        if self.github_label.x - 100 < x < self.github_label.x + self.github_label.content_width and \
+                self.github_label.y - 20 < y < self.github_label.y + self.github_label.content_height:
+            self.add_to_console("Opening GitHub page...")
+            # Open GitHub link
+            self.open_github()
+
+    def on_mouse_motion(self, x, y, dx, dy):
+        """Handles mouse movement to detect if it's hovering over the button."""
+        if self.browse_button.x < x < self.browse_button.x + self.browse_button.width and \
+                self.browse_button.y < y < self.browse_button.y + self.browse_button.height:
+            self.is_hovering_button = True
+        else:
+            self.is_hovering_button = False
+
+    def on_mouse_press(self, x, y, button, modifiers):
+        # Check if the user clicked the "Browse" button
+        if self.browse_button.x < x < self.browse_button.x + self.browse_button.width and \
+                self.browse_button.y < y < self.browse_button.y + self.browse_button.height:
+            # Open file dialog when the "Browse" button is clicked
+            threading.Thread(target=self.select_image).start()
+
+        # Check if the GitHub label is clicked
+        if self.github_label.x - 100 < x < self.github_label.x + self.github_label.content_width and \
+                self.github_label.y - 20 < y < self.github_label.y + self.github_label.content_height:
+            self.add_to_console("Opening GitHub page...")
+            # Open GitHub link
+            self.open_github()
+
+    def on_resize(self, width, height):
+        # Center the prompt label, browse button, and console relative to the window size
+        self.prompt_label.x = width // 2
+        self.prompt_label.y = height // 2 + 100
+
+        self.browse_button.x = width // 2 - 60
+        self.browse_button.y = height // 2
+        self.browse_text.x = width // 2
+        self.browse_text.y = height // 2 + 20
+
+        # Update GitHub label position 10 pixels from the right and 10 pixels from the bottom
+        self.github_label.x = 10
+        self.github_label.y = 10
+
+        # Reposition the console messages
+        self.update_console_positions()
+
+    def update_console_positions(self):
+        """Repositions the console lines dynamically from the bottom upwards, showing the latest messages."""
+        y_pos = 40  # Start just above the GitHub label
+        for i, label in enumerate(reversed(self.console_labels)):
+            label.x = self.width // 2
+            label.y = y_pos
+            y_pos += 20
+            if y_pos > self.browse_button.y - 20:  # Ensure messages don't cover the Browse button
+                break
+
+    def add_to_console(self, message, clear_last=False, progress_job=None):
+        """Adds a new line of text to the console, keeping only the latest messages visible."""
+        self.console_progress_job = progress_job
+
+        def _add_message(dt=None):
+            if clear_last and self.console_labels:
+                self.console_labels.pop()  # Remove the last label if clearing last message
+                self.console_messages.pop()
+
+            # Create a new label for the message
+            new_label = pyglet.text.Label(message, font_name='Arial', font_size=12, anchor_x='center')
+            self.console_labels.append(new_label)
+            self.console_messages.append(message)
+
+            # If more than max_console_lines, remove the oldest message
+            if len(self.console_labels) > self.max_console_lines:
+                self.console_labels.pop(0)
+                self.console_messages.pop(0)
+
+            # Update the positions of the labels
+            self.update_console_positions()
+
+        pyglet.clock.schedule_once(_add_message, 0)
+
+    def on_mouse_press(self, x, y, button, modifiers):
+        # Check if the user clicked the "Browse" button
+        if self.preview_sprite is None and \
+                self.browse_button.x < x < self.browse_button.x + self.browse_button.width and \
+                self.browse_button.y < y < self.browse_button.y + self.browse_button.height:
+            # Open file dialog when the "Browse" button is clicked (hidden while the preview is shown)
+            self.select_image()
+
+        # Check if the GitHub label is clicked
+        if self.github_label.x - 100 < x < self.github_label.x + self.github_label.content_width and \
+                self.github_label.y - 20 < y < self.github_label.y + self.github_label.content_height:
+            self.add_to_console("Opening GitHub page...")
+            # Open GitHub link
+            self.open_github()
+
+    def open_github(self):
+        url = "https://github.com/Fklyf/Image2ASCII"
+        try:
+            if os.name == 'posix':
+                subprocess.call(['xdg-open', url])
+            elif os.name == 'nt':
+                os.startfile(url)
+        except Exception as e:
+            self.add_to_console(f"Error opening GitHub: {e}")
+
+    def on_file_drop(self, x, y, paths):
+        """Handles the drag-and-drop functionality; several images share one set of dimensions."""
+        # Check if the files were dropped inside the Browse button area
+        if self.browse_button.x < x < self.browse_button.x + self.browse_button.width and \
+                self.browse_button.y < y < self.browse_button.y + self.browse_button.height:
+            self.close_source_images()  # Drop images still waiting for dimensions
+
+            accepted = []
+            for path in paths:
+                if self.is_image(path):
+                    accepted.append(path)
+                else:
+                    self.add_to_console(f"Rejected file: {path}. It is not a valid image format.")
+
+            if accepted:
+                self.image_path = accepted[0]
+                self.pending_paths = accepted
+                if len(accepted) == 1:
+                    self.add_to_console(f"Accepted image file: {self.image_path}")
+                else:
+                    self.add_to_console(f"Accepted {len(accepted)} image files")
+                self.ask_for_dimensions(self.image_path)
+        else:
+            # File wasn't dropped in the "Browse" button area, do nothing
+            self.add_to_console(f"File dropped outside the Browse button area. Please drop it onto the Browse button.")
+
+    def clear_console(self):
+        """Clears the console output."""
+        self.console_labels.clear()
+        self.console_messages.clear()
+        self.console_progress_job = None
+
+    def select_image(self):
+        # tkinter is only needed for this dialog, so it is loaded on first use
+        from tkinter import Tk, filedialog
+
+        # Hide the main tkinter window
+        root = Tk()
+        root.withdraw()
+
+        # Open file dialog
+        file_path = filedialog.askopenfilename(title="Select Image", filetypes=[
+            ("Image files", "*.png *.jpg *.jpeg *.bmp *.gif *.tiff *.webp")])
+
+        root.destroy()
+
+        self.close_source_images()  # Drop images still waiting for dimensions
+
+        if file_path and self.is_image(file_path):
+            self.image_path = file_path
+            self.pending_paths = [file_path]
+            self.add_to_console(f"Selected image: {self.image_path}")
+            self.ask_for_dimensions(self.image_path)
+        else:
+            # If no file is selected, show a message in the console
+            if not file_path:
+                self.add_to_console("No image selected. User closed the file dialog.")
+            else:
+                self.add_to_console("Invalid image file selected.")
+
+    def is_image(self, file_path):
+        # Validate file by checking the file type using Pillow (more robust than just extension).
+        # The file is read once: the preview, the cache key and the conversion all work from its bytes.
+        try:
+            with open(file_path, "rb") as f:
+                data = f.read()
+            self.source_images[file_path] = Image.open(io.BytesIO(data))
+            self.source_bytes[file_path] = data
+            return True
+        except (IOError, SyntaxError):
+            return False
+
+    def close_source_images(self):
+        """Closes the images kept open by is_image that were never queued."""
+        for image in self.source_images.values():
+            image.close()
+        self.source_images.clear()
+        self.source_bytes.clear()
+        self.pending_paths = []
+
+    def ask_for_dimensions(self, image_path):
+        """Ask for width and height in a non-blocking way, showing in the console."""
+        self.entering_width = True
+        self.awaiting_input = True
+        self.input_buffer = ""
+        self.input_disabled = False  # Allow new input after resetting
+        self.add_to_console("Enter desired width (leave blank for default, separate several with commas):")
+
+        # Build the preview pyramid in the background; the preview appears once it is ready
+        self.preview_pyramid = None
+        source = self.source_bytes.get(image_path)
+        threading.Thread(target=self.build_preview, args=(image_path, source), daemon=True).start()
+
+    def build_preview(self, image_path, source=None):
+        """Decodes the image once into a grayscale pyramid for live previews (runs on a worker thread)."""
+        try:
+            pyramid = PreviewPyramid.from_path(io.BytesIO(source) if source is not None else image_path)
+        except Exception:
+            return  # No preview; the conversion itself will report the problem
+        pyglet.clock.schedule_once(lambda dt: self.set_preview_pyramid(pyramid, image_path), 0)
+
+    def set_preview_pyramid(self, pyramid, image_path):
+        if image_path != self.image_path or not self.awaiting_input:
+            return  # A different image was selected, or conversion already started
+        self.preview_pyramid = pyramid
+        self.update_preview()
+
+    def update_preview(self):
+        """Re-renders the preview for the dimensions typed so far."""
+        if self.preview_pyramid is None:
+            return
+
+        # Zero is treated like a blank entry, meaning the default size. With several widths
+        # separated by commas, the one being typed is previewed.
+        last_entry = self.input_buffer.rsplit(",", 1)[-1]
+        typed = int(last_entry) if last_entry else None
+        if self.entering_width:
+            new_width, new_height = typed or None, None
+        else:
+            new_width, new_height = self.width_input, typed or None
+
+        bitmap = self.glyph_atlas.compose(self.preview_pyramid.pixels(new_width, new_height))
+        bitmap_height, bitmap_width = bitmap.shape
+        # pyglet images start at the bottom row
+        image = pyglet.image.ImageData(bitmap_width, bitmap_height, 'L', np.ascontiguousarray(bitmap[::-1]).tobytes())
+
+        if self.preview_sprite is None:
+            self.preview_sprite = pyglet.sprite.Sprite(image, batch=self.preview_batch)
+        else:
+            self.preview_sprite.image = image
+
+        # Fit the preview inside its area, never enlarging it
+        area_width = self.width - 2 * PREVIEW_MARGIN
+        area_height = self.height - PREVIEW_MARGIN - PREVIEW_BOTTOM
+        scale = min(area_width / bitmap_width, area_height / bitmap_height, 1.0)
+        self.preview_sprite.scale = scale
+        self.preview_sprite.x = (self.width - bitmap_width * scale) // 2
+        self.preview_sprite.y = PREVIEW_BOTTOM + (area_height - bitmap_height * scale) // 2
+
+    def clear_preview(self):
+        """Removes the preview and shows the prompt and Browse button again."""
+        if self.preview_sprite is not None:
+            self.preview_sprite.delete()
+            self.preview_sprite = None
+        self.preview_pyramid = None
+
+    def on_text(self, text):
+        if self.awaiting_input and not self.input_disabled:
+            # Handle Enter key
+            if text == '\r':  # Enter key
+                self.input_disabled = True
+                if not self.input_buffer.strip():  # No input provided
+                    self.add_to_console("No input provided, using default size.", clear_last=True)
+                    if self.entering_width:
+                        self.width_input = None  # Default value
+                        self.rendition_widths = None
+                        self.entering_width = False
+                        self.input_disabled = False  # Re-enable for height input
+                        self.add_to_console("Enter desired height (leave blank for default):")
+                        self.update_preview()
+                    else:
+                        self.height_input = None  # Default value
+                        self.start_image_processing()  # Start image processing
+                    self.input_buffer = ""
+                else:
+                    if self.entering_width:
+                        self.add_to_console(f"Width entered: {self.input_buffer}", clear_last=True)
+                        widths = [int(width) for width in self.input_buffer.split(",") if width]
+                        self.width_input = widths[0] if widths else None
+                        # Several comma-separated widths produce one file per width
+                        self.rendition_widths = widths if len(widths) > 1 else None
+                        self.input_buffer = ""
+                        self.entering_width = False
+                        self.input_disabled = False  # Re-enable input for height
+                        self.add_to_console("Enter desired height (leave blank for default):")
+                        self.update_preview()
+                    else:
+                        self.add_to_console(f"Height entered: {self.input_buffer}", clear_last=True)
+                        self.height_input = int(self.input_buffer)
+                        self.input_buffer = ""
+                        self.start_image_processing()  # Start the image processing
+                return
+
+            # Ensure only numeric input is allowed, plus commas between several widths
+            if text.isdigit() or (text == "," and self.entering_width):
+                self.input_buffer += text
+                self.update_input_line()
+
+    def on_text_motion(self, motion):
+        """Handle special keys like backspace."""
+        if self.awaiting_input and not self.input_disabled:
+            if motion == key.MOTION_BACKSPACE:
+                # Handle backspace key
+                if len(self.input_buffer) > 0:
+                    self.input_buffer = self.input_buffer[:-1]
+                self.update_input_line()
+
+    def update_input_line(self):
+        """Updates the displayed input line for width or height."""
+        if self.entering_width:
+            self.add_to_console(f"Enter desired width: {self.input_buffer}", clear_last=True)
+        else:
+            self.add_to_console(f"Enter desired height: {self.input_buffer}", clear_last=True)
+        self.update_preview()
+
+    def start_image_processing(self):
+        """Queue the chosen image(s) for conversion, leaving the UI free to pick the next one."""
+        self.clear_preview()
+        self.awaiting_input = False
+        for image_path in self.pending_paths:
+            image = self.source_images.pop(image_path, None)
+            source = self.source_bytes.pop(image_path, None)
+            try:
+                self.job_queue.submit(image_path, self.width_input, self.height_input, image=image,
+                                      source=source, widths=self.rendition_widths)
+            except QueueFull as e:
+                if image is not None:
+                    image.close()
+                self.add_to_console(f"Not queued: {os.path.basename(image_path)} ({e})")
+        self.pending_paths = []
+
+    def on_key_press(self, symbol, modifiers):
+        # Escape cancels running and queued conversions; with nothing running it closes the window as usual
+        if symbol == key.ESCAPE and self.job_queue.active_jobs():
+            self.job_queue.cancel_all()
+            self.add_to_console("Cancelling conversions...")
+            return pyglet.event.EVENT_HANDLED
+        return super().on_key_press(symbol, modifiers)
+
+    def on_close(self):
+        self.job_queue.cancel_all()
+        self.close_source_images()
+        self.result_cache.flush()  # Hits since the last conversion only updated recency in memory
+        super().on_close()
+
+    def run_job(self, job):
+        """Job queue worker: converts one image, returning the path of the written file."""
+        with self.instrumentation.run(image=job.image_path):
+            return self.convert_and_save(job)
+
+    def convert_and_save(self, job):
+        """Runs the conversion stages, writes the result and opens it."""
+        image_path = job.image_path
+        with self.instrumentation.stage("open"):
+            image = job.options.pop("image", None)
+            if image is None:
+                image = Image.open(image_path)
+
+        # Get the file name without extension for renaming
+        file_name, _ = os.path.splitext(os.path.basename(image_path))
+
+        # Missing dimensions are filled in from the image by each conversion (see core.output_size)
+        new_width, new_height = job.new_width, job.new_height
+
+        try:
+            if is_multi_frame(image):
+                # Animated and multi-page images have every frame converted into a frame sequence file
+                ascii_file_path = self.convert_frames_to_ascii(job, image, new_width, new_height)
+            elif job.options.get("widths"):
+                # Several widths typed at once are all rendered from one decode
+                paths = self.convert_renditions_to_ascii(job, image, job.options["widths"], job.new_height)
+                with self.instrumentation.stage("open_file"):
+                    self.open_file(paths[0])
+                return ", ".join(paths)
+            else:
+                ascii_file_path = self.convert_single_frame_to_ascii(job, image, file_name, new_width, new_height)
+        finally:
+            # Files are no longer verified up front, so a corrupt image surfaces here while decoding
+            image.close()
+
+        # Open the file with the system's default viewer
+        with self.instrumentation.stage("open_file"):
+            self.open_file(ascii_file_path)
+        return ascii_file_path
+
+    def convert_single_frame_to_ascii(self, job, image, file_name, new_width, new_height):
+        """Convert a still image, returning the path of the written ASCII file."""
+        # Reuse a previous conversion of the same file and settings without decoding the image
+        with self.instrumentation.stage("cache_lookup"):
+            # Hashed from the bytes is_image read, and sized from the open image, so the file is not read again
+            source = job.options.get("source")
+            digest = hashlib.sha256(source).hexdigest() if source is not None else None
+            key = cache_key(job.image_path, new_width, new_height, dither=self.dither, digest=digest,
+                            source_size=image.size)
+            ascii_bytes = self.result_cache.get(key)
+
+        if ascii_bytes is None:
+            # Decode close to the target size, resize and convert to grayscale
+            image = load_resized(image, new_width, new_height, instrumentation=self.instrumentation)
+            with self.instrumentation.stage("grayscale"):
+                image = grayscale_image(image)
+            pixels = np.array(image)
+            if self.dither != "none":
+                with self.instrumentation.stage("dither"):
+                    pixels = dither_for_ramp(pixels, dither=self.dither)
+
+            # The height of the image is the number of lines
+            total_lines = image.size[1]
+            job.report(0, total_lines)
+
+            # Convert to ASCII, reporting progress as each chunk of rows is mapped
+            with self.instrumentation.stage("map"):
+                ascii_bytes = render_ascii(pixels, progress=lambda lines: job.report(lines, total_lines),
+                                           workers=MAP_WORKERS)
+            self.result_cache.put(key, ascii_bytes)
+
+        cache_stats = self.result_cache.stats()
+        pyglet.clock.schedule_once(lambda dt: self.add_to_console(cache_stats), 0)
+
+        # Save the result to a file
+        ascii_file_path = f"{file_name}_ASCII.txt"
+        with self.instrumentation.stage("write"):
+            with open(ascii_file_path, "w") as f:
+                f.write(ascii_bytes.decode("ascii"))
+        return ascii_file_path
+
+    def convert_renditions_to_ascii(self, job, image, widths, new_height):
+        """Convert a still image at several widths from a single decode, returning the written paths."""
+        job.report(0, len(widths))
+        renditions = render_renditions(image, [(width, new_height) for width in widths],
+                                       instrumentation=self.instrumentation)
+
+        paths = []
+        with self.instrumentation.stage("write"):
+            for width, ascii_bytes in zip(widths, renditions):
+                ascii_file_path = rendition_output_path(job.image_path, width)
+                with open(ascii_file_path, "w") as f:
+                    f.write(ascii_bytes.decode("ascii"))
+                paths.append(ascii_file_path)
+                job.report(len(paths), len(widths))
+        return paths
+
+    def convert_frames_to_ascii(self, job, image, new_width, new_height):
+        """Convert every frame of a multi-frame image, returning the path of the frame sequence file."""
+        # Progress is tracked in frames rather than lines
+        total_frames = image.n_frames
+        job.report(0, total_frames)
+        image.close()
+
+        ascii_file_path = frame_sequence_path(job.image_path)
+        with self.instrumentation.stage("frames"):
+            source = job.options.get("source")
+            frames_written, frames_skipped = convert_frames_to_ascii(
+                io.BytesIO(source) if source is not None else job.image_path, ascii_file_path, new_width, new_height,
+                progress=lambda frames: job.report(frames, total_frames), dither=self.dither)
+        pyglet.clock.schedule_once(
+            lambda dt: self.add_to_console(f"Converted {frames_written} frames ({frames_skipped} duplicates skipped)"), 0)
+        return ascii_file_path
+
+    def report_stage(self, event):
+        """Instrumentation callback: shows each finished stage in the console."""
+        message = format_event(event)
+        pyglet.clock.schedule_once(lambda dt: self.add_to_console(message), 0)
+
+    def on_job_event(self, job, event):
+        """Job queue callback (runs on a worker thread): hands the event to the pyglet loop."""
+        pyglet.clock.schedule_once(lambda dt: self.show_job_event(job, event), 0)
+
+    def show_job_event(self, job, event):
+        """Shows queue, progress and completion messages for a job in the console."""
+        name = os.path.basename(job.image_path)
+        if event == "queued":
+            self.add_to_console(f"Queued {name}")
+        elif event in ("started", "progress"):
+            # Keep updating the same line while this job's progress is the latest message
+            replace = self.console_progress_job == job.id
+            self.add_to_console(f"Processing {name}... ({job.percentage}%)", clear_last=replace, progress_job=job.id)
+        elif event == "done":
+            self.add_to_console(f"ASCII art successfully written to {job.result}!")
+        elif event == "failed":
+            self.add_to_console(f"Unable to convert {name}. Error: {job.error}")
+        elif event == "cancelled":
+            self.add_to_console(f"Cancelled {name}")
+
+    def open_file(self, file_path):
+        # Open the file with the default system program
+        try:
+            if os.name == 'posix':
+                subprocess.call(['xdg-open', file_path])
+            elif os.name == 'nt':
+                os.startfile(file_path)
+            else:
+                self.add_to_console(f"Cannot open file: {file_path}. Unsupported OS.")
+        except Exception as e:
+            pyglet.clock.schedule_once(lambda dt: self.add_to_console(f"Error opening file: {e}"), 0)
+
+
+def main():
+    try:
+        window = ImageApp()
+        pyglet.app.run()
+    except KeyboardInterrupt:
+        print("Application stopped.")
+
+
+if __name__ == "__main__":
+    main()
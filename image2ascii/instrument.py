@@ -0,0 +1,184 @@
+"""Per-stage timing instrumentation for the conversion pipeline.
+
+Wrap each stage in ``instrumentation.stage(name)`` to record its wall time,
+CPU time and (optionally) peak traced memory. Every finished stage is sent to
+the registered callbacks and, if configured, appended to a JSON-lines log.
+A whole run can also be captured with cProfile and tracemalloc dumps.
+
+When instrumentation is disabled ``stage()`` hands back one shared no-op
+context manager, so the pipeline pays only an attribute lookup and a call.
+
+The GUI reads its configuration from the environment:
+
+    IMAGE2ASCII_TIMINGS=1            report stage timings in the console
+    IMAGE2ASCII_TIMINGS_LOG=path     append stage events as JSON lines
+    IMAGE2ASCII_TRACK_MEMORY=1       record peak memory per stage
+    IMAGE2ASCII_PROFILE=path         write a cProfile dump per conversion
+    IMAGE2ASCII_TRACEMALLOC=path     write a tracemalloc snapshot per conversion
+
+Dumps are numbered per run, e.g. ``conversion-1.prof``, ``conversion-2.prof``.
+
+Peak memory comes from tracemalloc, which sees Python and NumPy allocations
+but not Pillow's internal image buffers.
+
+CPU time is the whole process's, so it includes the row-band threads a stage
+hands work to; a run overlapping another one is charged for both.
+
+Runs on different threads may overlap: each thread tags its events with its
+own run's context. Peak memory and profilers are process-wide, though, so
+while either is enabled whole runs take turns rather than overlapping.
+"""
+import contextlib
+import itertools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, instrumentation, name, context):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.context = context
+
+    def __enter__(self):
+        if self.instrumentation.track_memory:
+            tracemalloc.reset_peak()
+            self.start_memory = tracemalloc.get_traced_memory()[0]
+        self.start_cpu = time.process_time()
+        self.start_wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event = {
+            "stage": self.name,
+            "wall": time.perf_counter() - self.start_wall,
+            "cpu": time.process_time() - self.start_cpu,
+            "peak_bytes": None,
+            "ok": exc_type is None,
+            "time": time.time(),
+        }
+        if self.instrumentation.track_memory:
+            event["peak_bytes"] = tracemalloc.get_traced_memory()[1] - self.start_memory
+        event.update(self.context)
+        self.instrumentation.emit(event)
+        return False
+
+
+class Instrumentation:
+    """Collects stage events and fans them out to callbacks and an optional log file."""
+
+    def __init__(self, enabled=True, log_path=None, track_memory=False, profile_path=None,
+                 tracemalloc_path=None):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.track_memory = enabled and (track_memory or tracemalloc_path is not None)
+        self.profile_path = profile_path
+        self.tracemalloc_path = tracemalloc_path
+        self.callbacks = []
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        # Held for a whole run while peaks or profiles are recorded, which other runs would disturb
+        self.exclusive = threading.Lock() if self.track_memory or profile_path else None
+        self.run_numbers = itertools.count(1)
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @classmethod
+    def from_env(cls, environ=None):
+        environ = os.environ if environ is None else environ
+        log_path = environ.get("IMAGE2ASCII_TIMINGS_LOG") or None
+        profile_path = environ.get("IMAGE2ASCII_PROFILE") or None
+        tracemalloc_path = environ.get("IMAGE2ASCII_TRACEMALLOC") or None
+        enabled = (environ.get("IMAGE2ASCII_TIMINGS", "") not in ("", "0")
+                   or any((log_path, profile_path, tracemalloc_path)))
+        return cls(enabled=enabled, log_path=log_path,
+                   track_memory=environ.get("IMAGE2ASCII_TRACK_MEMORY", "") not in ("", "0"),
+                   profile_path=profile_path, tracemalloc_path=tracemalloc_path)
+
+    @property
+    def context(self):
+        """Context of the run in progress on the calling thread."""
+        return getattr(self.local, "context", {})
+
+    @context.setter
+    def context(self, context):
+        self.local.context = context
+
+    def subscribe(self, callback):
+        """Registers callback(event) to be called after every stage; returns it for use as a decorator."""
+        self.callbacks.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        self.callbacks.remove(callback)
+
+    def stage(self, name, **context):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, {**self.context, **context})
+
+    def emit(self, event):
+        if self.log_path:
+            line = json.dumps(event) + "\n"
+            with self.lock, open(self.log_path, "a") as f:
+                f.write(line)
+        for callback in list(self.callbacks):
+            callback(event)
+
+    @contextlib.contextmanager
+    def run(self, **context):
+        """Wraps one whole conversion: tags its events with context and writes profile dumps."""
+        if not self.enabled:
+            yield self
+            return
+
+        with self.exclusive or contextlib.nullcontext():
+            previous = self.context
+            self.context = {**previous, **context}
+            number = next(self.run_numbers)
+            profiler = None
+            if self.profile_path:
+                import cProfile
+                profiler = cProfile.Profile()
+                profiler.enable()
+            try:
+                yield self
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                    profiler.dump_stats(numbered_path(self.profile_path, number))
+                if self.tracemalloc_path:
+                    tracemalloc.take_snapshot().dump(numbered_path(self.tracemalloc_path, number))
+                self.context = previous
+
+
+# path with a run number before its extension, so every run keeps its own dump
+def numbered_path(path, number):
+    root, extension = os.path.splitext(path)
+    return f"{root}-{number}{extension}"
+
+
+# Shared disabled instance used as the default everywhere
+NULL_INSTRUMENTATION = Instrumentation(enabled=False)
+
+
+def format_event(event):
+    """One-line summary of a stage event for consoles."""
+    text = f"{event['stage']}: {event['wall'] * 1000:.1f} ms wall, {event['cpu'] * 1000:.1f} ms CPU"
+    if event.get("peak_bytes") is not None:
+        text += f", peak {event['peak_bytes'] / 1e6:.1f} MB"
+    return text
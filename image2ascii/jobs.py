@@ -0,0 +1,175 @@
+"""Bounded background job queue for conversions.
+
+A fixed number of worker threads take jobs from a queue of at most
+``max_queued`` waiting jobs. Workers block on the queue while idle, so an idle
+queue costs no CPU. A job is registered and its ``queued`` event sent before
+any worker can see it, so its events always arrive in order. Each job pushes
+events to a single ``on_event(job, event)`` callback: ``queued``,
+``started``, ``progress`` (throttled to ``progress_interval``), and exactly
+one of ``done``, ``failed`` or ``cancelled``. The callback runs on the worker
+thread; a GUI should hand it over to its own event loop.
+"""
+import itertools
+import queue
+import threading
+import time
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+# Minimum time between progress events for one job (seconds)
+PROGRESS_INTERVAL = 0.1
+
+
+class JobCancelled(Exception):
+    """Raised from Job.report inside a worker when its job has been cancelled."""
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when the queue is at capacity."""
+
+
+class Job:
+    """One queued conversion: its inputs, state, progress and result."""
+
+    def __init__(self, job_id, image_path, new_width=None, new_height=None, **options):
+        self.id = job_id
+        self.image_path = image_path
+        self.new_width = new_width
+        self.new_height = new_height
+        self.options = options
+        self.state = QUEUED
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.last_progress = 0.0
+        self.job_queue = None
+
+    @property
+    def percentage(self):
+        return int(self.done / self.total * 100) if self.total else 0
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def report(self, done, total=None):
+        """Progress callback for the worker; raises JobCancelled once the job is cancelled."""
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+        if total is not None:
+            self.total = total
+        self.done = done
+        self.job_queue.progress(self)
+
+    def cancel(self):
+        self.job_queue.cancel(self)
+
+
+class JobQueue:
+    """Runs worker(job) for each submitted job on a fixed pool of threads."""
+
+    def __init__(self, worker, on_event=None, max_workers=2, max_queued=32,
+                 progress_interval=PROGRESS_INTERVAL):
+        self.worker = worker
+        self.on_event = on_event
+        self.progress_interval = progress_interval
+        self.max_queued = max_queued
+        # One slot per waiting job, taken by submit and given back when a worker picks the job up
+        self.slots = threading.Semaphore(max_queued)
+        self.pending = queue.Queue()
+        self.jobs = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.threads = [threading.Thread(target=self.run, name=f"image2ascii-worker-{i}", daemon=True)
+                        for i in range(max_workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, image_path, new_width=None, new_height=None, **options):
+        job = Job(next(self.ids), image_path, new_width, new_height, **options)
+        job.job_queue = self
+        if not self.slots.acquire(blocking=False):
+            raise QueueFull(f"{self.max_queued} jobs are already queued")
+        with self.lock:
+            self.jobs[job.id] = job
+        self.emit(job, QUEUED)
+        self.pending.put(job)
+        return job
+
+    def cancel(self, job):
+        with self.lock:
+            if job.state in FINISHED_STATES or job.cancel_event.is_set():
+                return
+            job.cancel_event.set()
+            was_queued = job.state == QUEUED
+            if was_queued:
+                job.state = CANCELLED
+        # Running jobs notice at their next progress report and emit from the worker
+        if was_queued:
+            # No worker will open this job, so release an image handed over with it
+            image = job.options.pop("image", None)
+            if image is not None:
+                image.close()
+            self.finish(job)
+
+    def cancel_all(self):
+        for job in self.active_jobs():
+            self.cancel(job)
+
+    def active_jobs(self):
+        with self.lock:
+            return [job for job in self.jobs.values() if job.state not in FINISHED_STATES]
+
+    def progress(self, job):
+        now = time.monotonic()
+        if now - job.last_progress >= self.progress_interval or job.done == job.total:
+            job.last_progress = now
+            self.emit(job, "progress")
+
+    def emit(self, job, event):
+        if self.on_event is not None:
+            self.on_event(job, event)
+
+    def finish(self, job):
+        with self.lock:
+            self.jobs.pop(job.id, None)
+        self.emit(job, job.state)
+
+    def run(self):
+        while True:
+            job = self.pending.get()
+            if job is None:
+                return
+            self.slots.release()
+            with self.lock:
+                if job.state == CANCELLED:
+                    continue  # Cancelled while queued; already reported
+                job.state = RUNNING
+            self.emit(job, "started")
+
+            try:
+                job.result = self.worker(job)
+                job.state = DONE
+            except JobCancelled:
+                job.state = CANCELLED
+            except Exception as e:
+                job.error = e
+                job.state = FAILED
+            self.finish(job)
+
+    def shutdown(self, cancel=True):
+        """Stops the workers once their current jobs finish, optionally cancelling everything first."""
+        if cancel:
+            self.cancel_all()
+        for _ in self.threads:
+            self.pending.put(None)
+        for thread in self.threads:
+            thread.join()
@@ -0,0 +1,292 @@
+"""Compact binary storage for ASCII art.
+
+A ``.i2a`` file holds the same rows as the ``_ASCII.txt`` output, with every
+cell stored as a 4-bit index into the file's ramp (at most 16 characters) and
+the newlines implied by the width. Layout, all integers little-endian:
+
+    header       magic, version, compression, ramp length, width, height,
+                 rows per block, SHA-256 of the source image (zeros if unknown)
+    ramp         the characters the indices refer to
+    block table  byte offsets of each block from the start of the data, plus
+                 the end offset (compressed files only)
+    data         rows of ceil(width / 2) bytes, high nibble first
+
+Uncompressed rows are found by arithmetic. Compressed files are split into
+blocks of ``block_rows`` rows that are compressed on their own (zlib, or a
+byte-pair run-length encoding that suits the long runs of blank cells), so a
+single row can be read by decompressing just its block. ``decode_packed``
+expands a file back to exactly the text the ``.txt`` output would contain.
+
+    python -m image2ascii.packed art.i2a               print the text
+    python -m image2ascii.packed art.i2a --rows 10:20  print only rows 10-19
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+
+from image2ascii.core import ASCII_CHARS
+
+MAGIC = b"I2AP"
+VERSION = 1
+PACKED_EXTENSION = ".i2a"
+
+# Compression of the row data
+NONE = 0
+ZLIB = 1
+RLE = 2
+COMPRESSIONS = {"none": NONE, "zlib": ZLIB, "rle": RLE}
+
+# magic, version, compression, ramp length, width, height, rows per block, source digest
+HEADER = struct.Struct("<4sBBHIII32s")
+
+# Rows per independently compressed block; smaller blocks make single-row reads cheaper
+BLOCK_ROWS = 64
+
+# Four bits per cell
+MAX_RAMP = 16
+
+
+class PackedFormatError(ValueError):
+    """Raised for files that are not valid packed ASCII art."""
+
+
+# Ramp for a piece of text: the characters of chars that occur, in ramp order, then any others
+def text_ramp(cells, chars=ASCII_CHARS):
+    present = np.flatnonzero(np.bincount(cells.ravel(), minlength=256))
+    ramp = [code for code in chars.encode("ascii") if code in present]
+    ramp += [int(code) for code in present if code not in ramp]
+    if len(ramp) > MAX_RAMP:
+        raise ValueError(f"text uses {len(ramp)} distinct characters; packing allows at most {MAX_RAMP}")
+    return bytes(ramp)
+
+
+# Split ASCII text into a (height, width) array of character codes
+def text_cells(ascii_bytes):
+    width = ascii_bytes.find(b"\n")
+    if width < 0:
+        raise ValueError("text has no complete rows")
+    rows = np.frombuffer(ascii_bytes, dtype=np.uint8)
+    if rows.size % (width + 1):
+        raise ValueError("rows have different lengths")
+    rows = rows.reshape(-1, width + 1)
+    if not (rows[:, width] == ord("\n")).all():
+        raise ValueError("rows have different lengths")
+    return rows[:, :width]
+
+
+# Pack a (height, width) array of 4-bit indices two cells per byte, high nibble first
+def pack_indices(indices):
+    height, width = indices.shape
+    if width % 2:
+        indices = np.pad(indices, ((0, 0), (0, 1)))
+    return (indices[:, 0::2] << 4) | indices[:, 1::2]
+
+
+def unpack_indices(packed, width):
+    indices = np.empty((packed.shape[0], packed.shape[1] * 2), dtype=np.uint8)
+    indices[:, 0::2] = packed >> 4
+    indices[:, 1::2] = packed & 0x0F
+    return indices[:, :width]
+
+
+# Run-length encode bytes as (count, value) pairs, runs capped at 255
+def rle_encode(data):
+    values = np.frombuffer(data, dtype=np.uint8)
+    if values.size == 0:
+        return b""
+    starts = np.flatnonzero(np.concatenate(([True], values[1:] != values[:-1])))
+    lengths = np.diff(np.append(starts, values.size))
+
+    # Split runs longer than 255 into full runs plus a remainder
+    pieces = (lengths + 254) // 255
+    run_values = np.repeat(values[starts], pieces)
+    run_lengths = np.full(run_values.size, 255, dtype=np.int64)
+    last = np.cumsum(pieces) - 1
+    run_lengths[last] = lengths - (pieces - 1) * 255
+
+    pairs = np.empty((run_values.size, 2), dtype=np.uint8)
+    pairs[:, 0] = run_lengths
+    pairs[:, 1] = run_values
+    return pairs.tobytes()
+
+
+def rle_decode(data):
+    pairs = np.frombuffer(data, dtype=np.uint8).reshape(-1, 2)
+    return np.repeat(pairs[:, 1], pairs[:, 0]).tobytes()
+
+
+COMPRESSORS = {ZLIB: lambda data: zlib.compress(data, 6), RLE: rle_encode}
+DECOMPRESSORS = {ZLIB: zlib.decompress, RLE: rle_decode}
+
+
+# Encode ASCII text (as written by render_ascii) into the packed format, returning the file contents
+def pack_ascii(ascii_bytes, chars=ASCII_CHARS, compression=NONE, source_digest=None, block_rows=BLOCK_ROWS):
+    cells = text_cells(ascii_bytes)
+    height, width = cells.shape
+    ramp = text_ramp(cells, chars)
+
+    # Map every character code to its ramp index
+    index_of = np.zeros(256, dtype=np.uint8)
+    index_of[np.frombuffer(ramp, dtype=np.uint8)] = np.arange(len(ramp), dtype=np.uint8)
+    packed = pack_indices(index_of[cells])
+
+    digest = bytes.fromhex(source_digest) if source_digest else bytes(32)
+    header = HEADER.pack(MAGIC, VERSION, compression, len(ramp), width, height, block_rows, digest)
+    if compression == NONE:
+        return b"".join((header, ramp, packed.tobytes()))
+
+    compress = COMPRESSORS[compression]
+    blocks = [compress(packed[start:start + block_rows].tobytes()) for start in range(0, height, block_rows)]
+    offsets = np.zeros(len(blocks) + 1, dtype="<u8")
+    np.cumsum([len(block) for block in blocks], out=offsets[1:])
+    return b"".join([header, ramp, offsets.tobytes()] + blocks)
+
+
+# Packed counterpart of a .txt output path
+def packed_output_path(ascii_file_path):
+    return os.path.splitext(ascii_file_path)[0] + PACKED_EXTENSION
+
+
+# Write packed ASCII art with one buffered write
+def write_packed(path, ascii_bytes, chars=ASCII_CHARS, compression=NONE, source_digest=None):
+    data = pack_ascii(ascii_bytes, chars, compression, source_digest)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+class PackedReader:
+    """Random access to the rows of a packed file through a memory map."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            try:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise PackedFormatError(f"{path} is empty") from None
+        try:
+            self.read_header(path)
+        except BaseException:
+            self.map.close()
+            raise
+        self.block_cache = (None, None)
+
+    def read_header(self, path):
+        if len(self.map) < HEADER.size:
+            raise PackedFormatError(f"{path} is too short to be packed ASCII art")
+        (magic, version, self.compression, ramp_length, self.width, self.height, self.block_rows,
+         digest) = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise PackedFormatError(f"{path} is not packed ASCII art")
+        if version != VERSION:
+            raise PackedFormatError(f"{path} uses format version {version}, expected {VERSION}")
+        if self.compression not in (NONE, ZLIB, RLE):
+            raise PackedFormatError(f"{path} uses unknown compression {self.compression}")
+
+        self.source_digest = digest.hex() if any(digest) else None
+        offset = HEADER.size
+        self.ramp = bytes(self.map[offset:offset + ramp_length])
+        offset += ramp_length
+        self.row_bytes = (self.width + 1) // 2
+
+        # Decoding goes through a 16-entry table from index to character
+        self.chars = np.zeros(MAX_RAMP, dtype=np.uint8)
+        self.chars[:ramp_length] = np.frombuffer(self.ramp, dtype=np.uint8)
+
+        if self.compression == NONE:
+            self.offsets = None
+        else:
+            blocks = (self.height + self.block_rows - 1) // self.block_rows
+            self.offsets = np.frombuffer(self.map, dtype="<u8", count=blocks + 1, offset=offset)
+            offset += self.offsets.nbytes
+        self.data_start = offset
+
+    def __len__(self):
+        return self.height
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.offsets = None  # Release the view before closing the map
+        self.map.close()
+
+    def block(self, index):
+        """Packed rows of one compressed block, keeping the last block decompressed."""
+        cached_index, cached_rows = self.block_cache
+        if cached_index == index:
+            return cached_rows
+        start, stop = (self.data_start + int(offset) for offset in self.offsets[index:index + 2])
+        data = DECOMPRESSORS[self.compression](self.map[start:stop])
+        rows = np.frombuffer(data, dtype=np.uint8).reshape(-1, self.row_bytes)
+        self.block_cache = (index, rows)
+        return rows
+
+    def packed_rows(self, start, stop):
+        if self.compression == NONE:
+            count = stop - start
+            return np.frombuffer(self.map, dtype=np.uint8, count=count * self.row_bytes,
+                                 offset=self.data_start + start * self.row_bytes).reshape(count, self.row_bytes)
+
+        first, last = start // self.block_rows, (stop - 1) // self.block_rows
+        rows = np.concatenate([self.block(index) for index in range(first, last + 1)])
+        offset = first * self.block_rows
+        return rows[start - offset:stop - offset]
+
+    def read_rows(self, start=0, stop=None):
+        """Text of rows start to stop (exclusive), each ending in a newline."""
+        stop = self.height if stop is None else min(stop, self.height)
+        start = max(0, start)
+        if start >= stop:
+            return b""
+        indices = unpack_indices(self.packed_rows(start, stop), self.width)
+        out = np.empty((stop - start, self.width + 1), dtype=np.uint8)
+        out[:, self.width] = ord("\n")
+        np.take(self.chars, indices, out=out[:, :self.width])
+        return out.tobytes()
+
+    def row(self, index):
+        """Text of one row without its newline."""
+        if not -self.height <= index < self.height:
+            raise IndexError(f"row {index} out of range for {self.height} rows")
+        index %= self.height
+        return self.read_rows(index, index + 1)[:-1].decode("ascii")
+
+
+# Expand a packed file back to the exact text of the .txt output
+def decode_packed(path):
+    with PackedReader(path) as reader:
+        return reader.read_rows()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="image2ascii.packed", description="Print the text of a packed ASCII art file.")
+    parser.add_argument("path", help=f"{PACKED_EXTENSION} file to decode")
+    parser.add_argument("--rows", default=None, metavar="START:STOP", help="only print these rows")
+    parser.add_argument("--info", action="store_true", help="print the header instead of the text")
+    args = parser.parse_args(argv)
+
+    with PackedReader(args.path) as reader:
+        if args.info:
+            compression = {code: name for name, code in COMPRESSIONS.items()}[reader.compression]
+            print(f"{reader.width}x{reader.height} cells, ramp {reader.ramp.decode('ascii')!r}, "
+                  f"compression {compression}, source sha256 {reader.source_digest or 'unknown'}")
+            return 0
+        start, stop = 0, None
+        if args.rows:
+            first, _, last = args.rows.partition(":")
+            start, stop = int(first or 0), int(last) if last else None
+        sys.stdout.write(reader.read_rows(start, stop).decode("ascii"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
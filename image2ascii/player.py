@@ -0,0 +1,289 @@
+"""Terminal playback of frame sequences.
+
+Usage::
+
+    python -m image2ascii.player animation.gif --fps 15
+    python -m image2ascii.player photo_ASCII_frames.txt --loop
+    python -m image2ascii.player directory_of_images/
+
+Plays an animated image, a directory of images (in name order) or a frame
+sequence already written by ``convert_frames_to_ascii``. Frames play in the
+terminal itself instead of one viewer window per file.
+
+Frames are decoded and converted ahead of playback on a background thread.
+They pass through a queue of ``--prefetch`` frames, so memory stays bounded
+however long the sequence is. The screen keeps the cells it last drew. Each
+new frame writes only cursor moves and the runs of cells that changed, and
+short unchanged gaps are rewritten rather than jumped over. A frame that is
+ready but whose time slot has already passed is dropped, so playback keeps
+to the target rate. When the converter falls behind, playback waits for the
+next frame instead and counts a stall. Shown, dropped and stalled frames,
+the achieved FPS and the bytes written are reported at the end.
+"""
+import argparse
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+
+import numpy as np
+
+from image2ascii.core import ACCEPTED_FORMATS, ASCII_CHARS, image_to_ascii, ramp_lut, render_ascii
+from image2ascii.frames import (DEFAULT_FRAME_DURATION, FRAME_INDEX_NAME, FRAME_SEQUENCE_MAGIC,
+                                iter_grayscale_frames, read_frame_sequence)
+
+# Frames converted ahead of playback
+PREFETCH_FRAMES = 8
+
+# Unchanged gaps of up to this many cells are rewritten, which is shorter than a cursor move past them
+MAX_GAP_CELLS = 6
+
+# Alternate screen and hidden cursor while playing, restored afterwards
+ENTER_SCREEN = b"\x1b[?1049h\x1b[?25l\x1b[2J"
+LEAVE_SCREEN = b"\x1b[?25h\x1b[?1049l"
+
+
+def is_frame_sequence(path):
+    if os.path.isdir(path):
+        return os.path.isfile(os.path.join(path, FRAME_INDEX_NAME))
+    with open(path, "rb") as f:
+        return f.read(len(FRAME_SEQUENCE_MAGIC)) == FRAME_SEQUENCE_MAGIC.encode("ascii")
+
+
+# Yield (duration in ms, ASCII bytes) for every frame of a frame sequence, image directory or image;
+# chars only applies to images, since a frame sequence is already converted
+def iter_frames(source, new_width=None, new_height=None, chars=ASCII_CHARS):
+    if is_frame_sequence(source):
+        for duration, text in read_frame_sequence(source):
+            yield duration, text.encode("utf-8")
+    elif os.path.isdir(source):
+        names = sorted(name for name in os.listdir(source)
+                       if os.path.splitext(name)[1][1:].lower() in ACCEPTED_FORMATS)
+        for name in names:
+            yield DEFAULT_FRAME_DURATION, image_to_ascii(os.path.join(source, name), new_width, new_height,
+                                                         chars=chars)
+    else:
+        from PIL import Image
+
+        with Image.open(source) as image:
+            for pixels, duration in iter_grayscale_frames(image, new_width, new_height):
+                yield duration, render_ascii(pixels, ramp_lut(chars))
+
+
+class FramePrefetcher:
+    """Runs a frame iterator on a background thread, keeping at most max_frames converted ahead."""
+
+    END = object()
+
+    def __init__(self, make_frames, max_frames=PREFETCH_FRAMES, loop=False):
+        self.queue = queue.Queue(maxsize=max_frames)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, args=(make_frames, loop), daemon=True)
+        self.thread.start()
+
+    def run(self, make_frames, loop):
+        try:
+            while True:
+                count = 0
+                for frame in make_frames():
+                    if not self.put(frame):
+                        return
+                    count += 1
+                if not loop or count == 0:
+                    break
+        except Exception as e:
+            self.put(e)  # Raised again on the playback thread
+            return
+        self.put(self.END)
+
+    def put(self, item):
+        """Blocks while the queue is full; returns False once playback has stopped."""
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self):
+        """Next (duration, text) frame, or None at the end; also says whether playback had to wait for it."""
+        waited = self.queue.empty()
+        item = self.queue.get()
+        if item is self.END:
+            return None, waited
+        if isinstance(item, Exception):
+            raise item
+        return item, waited
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join()
+
+
+# UTF-8 bytes of a run of UCS-4 cells
+def cells_text(cells):
+    return cells.tobytes().decode("utf-32-le").encode("utf-8")
+
+
+# Escape sequences that turn the previous (rows, columns) cell array into the new one
+def diff_update(previous, cells, max_gap=MAX_GAP_CELLS):
+    changed = previous != cells
+    parts = []
+    for row in np.flatnonzero(changed.any(axis=1)):
+        columns = np.flatnonzero(changed[row])
+        # Split into runs wherever more than max_gap unchanged cells separate two changes
+        breaks = np.flatnonzero(np.diff(columns) > max_gap + 1)
+        starts = columns[np.concatenate(([0], breaks + 1))]
+        stops = columns[np.concatenate((breaks, [len(columns) - 1]))] + 1
+        for start, stop in zip(starts, stops):
+            parts.append(b"\x1b[%d;%dH" % (row + 1, start + 1))
+            parts.append(cells_text(cells[row, start:stop]))
+    return b"".join(parts)
+
+
+# Escape sequences that clear the screen and draw every row of a (rows, columns) cell array
+def full_update(cells):
+    return b"\x1b[H\x1b[2J" + b"\r\n".join(cells_text(row) for row in cells)
+
+
+class TerminalScreen:
+    """The cells currently on the terminal, one UCS-4 code point each, updated by writing only what changed."""
+
+    def __init__(self, out):
+        self.out = out
+        self.cells = None
+        self.bytes_written = 0
+        self.full_bytes = 0  # What redrawing every frame in full would have written
+
+    def draw(self, ascii_bytes):
+        # UTF-8 text of a Unicode ramp has characters of several bytes, so cells are code points
+        codes = np.frombuffer(ascii_bytes.decode("utf-8").encode("utf-32-le"), dtype="<u4")
+        width = int(np.argmax(codes == ord("\n")))
+        cells = codes.reshape(-1, width + 1)[:, :width]
+        full = full_update(cells)
+        if self.cells is None or self.cells.shape != cells.shape:
+            update = full
+        else:
+            update = diff_update(self.cells, cells)
+        self.cells = cells
+        self.out.write(update)
+        self.out.flush()
+        self.bytes_written += len(update)
+        self.full_bytes += len(full)
+
+
+class PlaybackStats:
+    """Counts of shown, dropped and stalled frames over one playback."""
+
+    def __init__(self):
+        self.shown = 0
+        self.dropped = 0
+        self.stalls = 0
+        self.scheduled_seconds = 0.0
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.start
+
+    def summary(self, screen):
+        frames = self.shown + self.dropped
+        fps = self.shown / self.elapsed if self.elapsed > 0 else 0.0
+        target = frames / self.scheduled_seconds if self.scheduled_seconds > 0 else 0.0
+        saved = 1 - screen.bytes_written / screen.full_bytes if screen.full_bytes else 0.0
+        return (f"Played {self.shown}/{frames} frames in {self.elapsed:.2f} s: {fps:.1f} fps "
+                f"(target {target:.1f}), {self.dropped} dropped, {self.stalls} stalls waiting for frames, "
+                f"{screen.bytes_written / 1024:.0f} KB written ({saved:.0%} less than full redraws)")
+
+
+# Play frames from a prefetcher on out at their own durations, or at fps when given, until the
+# frames end or Ctrl+C
+def play(prefetcher, out, fps=None, clock=time.perf_counter, sleep=time.sleep):
+    screen = TerminalScreen(out)
+    stats = PlaybackStats()
+    due = None  # When the next frame should appear
+    try:
+        while True:
+            frame, waited = prefetcher.get()
+            if frame is None:
+                break
+            duration, text = frame
+            interval = 1 / fps if fps else duration / 1000
+            stats.scheduled_seconds += interval
+            now = clock()
+            if due is None:
+                due = stats.start = now  # Time spent waiting for the first frame is not playback
+            elif now >= due + interval:
+                if waited:
+                    # The converter fell behind; show this frame now rather than skip everything after it
+                    stats.stalls += 1
+                    due = now
+                else:
+                    # Its whole slot has passed already, so keep to the schedule without it
+                    stats.dropped += 1
+                    due += interval
+                    continue
+            if now < due:
+                sleep(due - now)
+            screen.draw(text)
+            stats.shown += 1
+            due += interval
+        # Hold the last frame for its own duration too
+        if due is not None and clock() < due:
+            sleep(due - clock())
+    except KeyboardInterrupt:
+        pass  # Stopping early still reports what was played
+    stats.finish()
+    return stats, screen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="image2ascii.player",
+                                     description="Play an animation, image directory or frame sequence in the terminal.")
+    parser.add_argument("source", help="animated image, directory of images, or *_ASCII_frames file/directory")
+    parser.add_argument("-W", "--width", type=int, default=None,
+                        help="width in characters (default: fit the terminal)")
+    parser.add_argument("-H", "--height", type=int, default=None,
+                        help="height in characters (default: fit the terminal)")
+    parser.add_argument("--fps", type=float, default=None,
+                        help="frames per second (default: each frame's own duration)")
+    parser.add_argument("--prefetch", type=int, default=PREFETCH_FRAMES,
+                        help="frames converted ahead of playback (default: %(default)s)")
+    parser.add_argument("--ramp", default=None,
+                        help="characters to draw with, ordered by ink coverage, or a preset name")
+    parser.add_argument("--font", default=None, help="font the ramp's ink coverage is measured in")
+    parser.add_argument("--loop", action="store_true", help="play until interrupted with Ctrl+C")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.source):
+        parser.error(f"no such file or directory: {args.source}")
+    chars = ASCII_CHARS
+    if args.ramp:
+        from image2ascii.ramps import compile_ramp
+        try:
+            chars, _ = compile_ramp(args.ramp, args.font)
+        except (OSError, ValueError) as e:
+            parser.error(f"--ramp: {e}")
+
+    if args.width is None and args.height is None:
+        columns, lines = shutil.get_terminal_size()
+        args.width, args.height = columns, lines - 1  # Leave the last line free so nothing scrolls
+
+    out = sys.stdout.buffer
+    prefetcher = FramePrefetcher(lambda: iter_frames(args.source, args.width, args.height, chars),
+                                 max_frames=max(1, args.prefetch), loop=args.loop)
+    out.write(ENTER_SCREEN)
+    try:
+        stats, screen = play(prefetcher, out, fps=args.fps)
+    finally:
+        out.write(LEAVE_SCREEN)
+        out.flush()
+        prefetcher.close()
+    print(stats.summary(screen), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
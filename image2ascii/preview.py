@@ -0,0 +1,103 @@
+"""Fast ASCII previews for interactive size tuning.
+
+``PreviewPyramid`` decodes an image once into a stack of pre-downsampled
+grayscale levels, so each preview only resizes the nearest larger level and
+maps a small array. ``GlyphAtlas`` pre-renders every ramp character once and
+composes a whole preview into a single bitmap with one NumPy gather, which a
+GUI can upload as one texture instead of laying out text line by line.
+"""
+import math
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from image2ascii.core import ASCII_LUT, decode_for_size, grayscale_image, output_size
+
+# Width of the largest pyramid level; previews wider than this are upscaled from it
+PREVIEW_BASE_WIDTH = 1024
+
+# Stop halving once a level is narrower than this
+PREVIEW_MIN_WIDTH = 32
+
+# Widest preview rendered, in characters
+PREVIEW_MAX_COLUMNS = 400
+
+
+class PreviewPyramid:
+    """Grayscale downsample pyramid of one image, built once and reused for every preview."""
+
+    def __init__(self, image, base_width=PREVIEW_BASE_WIDTH):
+        self.source_size = image.size
+        width, height = image.size
+        if width > base_width:
+            base_size = (base_width, max(1, round(height * base_width / width)))
+        else:
+            base_size = image.size
+
+        decoded, box = decode_for_size(image, base_size)
+        level = grayscale_image(decoded.resize(base_size, box=box))
+        self.levels = [level]
+        while level.width // 2 >= PREVIEW_MIN_WIDTH and level.height >= 2:
+            level = level.reduce(2)
+            self.levels.append(level)
+
+    @classmethod
+    def from_path(cls, image_path, base_width=PREVIEW_BASE_WIDTH):
+        with Image.open(image_path) as image:
+            return cls(image, base_width)
+
+    def preview_size(self, new_width=None, new_height=None, max_columns=PREVIEW_MAX_COLUMNS):
+        """Output size for the requested dimensions, scaled down to max_columns (unless None) if needed."""
+        width, height = output_size(self.source_size, new_width, new_height)
+        if max_columns is not None and width > max_columns:
+            height = max(1, round(height * max_columns / width))
+            width = max_columns
+        return width, height
+
+    def level_for(self, width):
+        """The smallest level at least width pixels wide, or the largest level."""
+        for level in reversed(self.levels):
+            if level.width >= width:
+                return level
+        return self.levels[0]
+
+    def pixels(self, new_width=None, new_height=None, max_columns=PREVIEW_MAX_COLUMNS):
+        """Grayscale array of the preview, one pixel per character cell."""
+        size = self.preview_size(new_width, new_height, max_columns)
+        return np.array(self.level_for(size[0]).resize(size))
+
+
+# (width, height) of a cell holding any of chars in font: as wide as the widest and as tall as the
+# font's line; bitmap fonts without metrics use the lowest glyph edge instead
+def glyph_cell_size(font, chars):
+    if hasattr(font, "getmetrics"):
+        ascent, descent = font.getmetrics()
+        cell_height = ascent + descent
+    else:
+        cell_height = max(font.getbbox(c)[3] for c in chars + "@") + 1
+    return max(1, math.ceil(max(font.getlength(c) for c in chars))), cell_height
+
+
+class GlyphAtlas:
+    """Bitmaps of every ramp character, indexed directly by grayscale value."""
+
+    def __init__(self, lut=ASCII_LUT, font=None):
+        font = font or ImageFont.load_default()
+        codes = sorted(set(lut.tolist()))
+        chars = "".join(chr(code) for code in codes)
+        self.cell_width, self.cell_height = glyph_cell_size(font, chars)
+
+        glyphs = {}
+        for code, char in zip(codes, chars):
+            glyph = Image.new("L", (self.cell_width, self.cell_height), 255)
+            ImageDraw.Draw(glyph).text((0, 0), char, fill=0, font=font)
+            glyphs[code] = np.array(glyph)
+
+        # table[v] is the bitmap of the character grayscale value v maps to
+        self.table = np.stack([glyphs[code] for code in lut.tolist()])
+
+    def compose(self, pixels):
+        """Renders a grayscale array as one bitmap of glyphs (dark ink on white, like the text output)."""
+        rows, cols = pixels.shape
+        cells = self.table[pixels]  # (rows, cols, cell_height, cell_width)
+        return cells.transpose(0, 2, 1, 3).reshape(rows * self.cell_height, cols * self.cell_width)
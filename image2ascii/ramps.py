@@ -0,0 +1,150 @@
+"""Character ramps: presets, ordering by measured ink coverage, and cached lookup tables.
+
+A ramp is any string of 2 to 256 distinct characters: ASCII, Unicode block
+elements, Braille patterns or a mix of them. ``compile_ramp`` renders each
+glyph once in the given font and measures its ink coverage. It orders the
+ramp densest first and builds its 256-entry lookup table with
+``build_ascii_lut``, which gives every character an equal band of grayscale
+values (only the default characters, in their default order, keep the
+original table). The table is cached in memory and on disk, keyed by the ramp and the
+font, so later runs and ramp switches skip the measuring. The ordered
+characters are stored next to the table in the same file, since the table
+alone cannot give them back: the default table never uses ``.``.
+
+Fonts often lack block and Braille glyphs. A missing glyph is detected by
+comparing it with the font's placeholder glyph. Block elements and Braille
+patterns then use their exact geometric coverage instead, and whitespace
+always counts as blank. Any other missing glyph is an error, since it could
+not be ordered.
+"""
+import functools
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from image2ascii.core import ASCII_CHARS, MAX_RAMP_CHARS, MIN_RAMP_CHARS, build_ascii_lut, ramp_lut
+
+# Named ramps; the order here does not matter, compile_ramp sorts them by coverage
+PRESET_RAMPS = {
+    "standard": ASCII_CHARS,
+    "detailed": "$@B%8&WM#*oahkbdpqwmZO0QLCJUYXzcvunxrjft/\\|()1{}[]?-_+~<>i!lI;:,\"^`'. ",
+    "blocks": "█▓▒░ ",
+    "braille": "⣿⣷⣧⣇⡇⠇⠃⠁⠀",
+}
+
+# Glyphs are measured at this size, large enough for thin strokes to register
+RAMP_FONT_SIZE = 24
+
+# Bump when the measurement or the file layout changes, so stale cached tables are ignored
+RAMP_TABLE_VERSION = 2
+
+# A code point no font has a glyph for, rendered to get the font's placeholder glyph
+MISSING_GLYPH = "\U0010fffd"
+
+# Coverage of block elements by area
+BLOCK_COVERAGE = {"█": 1.0, "▓": 0.75, "▒": 0.5, "░": 0.25,
+                  "▀": 0.5, "▄": 0.5, "▌": 0.5, "▐": 0.5}
+BLOCK_COVERAGE.update({chr(0x2580 + k): k / 8 for k in range(1, 8)})  # Lower eighths
+BLOCK_COVERAGE.update({chr(0x2590 - k): k / 8 for k in range(1, 8)})  # Left eighths
+BLOCK_COVERAGE.update({"▖": 0.25, "▗": 0.25, "▘": 0.25, "▝": 0.25,
+                       "▚": 0.5, "▞": 0.5,
+                       "▙": 0.75, "▛": 0.75, "▜": 0.75, "▟": 0.75})
+
+
+# Coverage from a glyph's geometry alone, or None when the character has no known shape
+def geometric_coverage(char):
+    if char.isspace():
+        return 0.0
+    if "⠀" <= char <= "⣿":
+        return bin(ord(char) - 0x2800).count("1") / 8  # Raised dots out of eight
+    return BLOCK_COVERAGE.get(char)
+
+
+def load_ramp_font(font_path=None, size=RAMP_FONT_SIZE):
+    from PIL import ImageFont
+
+    if font_path:
+        return ImageFont.truetype(font_path, size)
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()  # Older Pillow: the fixed-size bitmap font
+
+
+# Ink coverage (0 blank to 1 solid) of each character in font, over a cell as wide as the widest
+def measure_coverage(chars, font):
+    from PIL import Image, ImageDraw
+
+    from image2ascii.preview import glyph_cell_size
+
+    def render(char):
+        glyph = Image.new("L", (cell_width, cell_height), 0)
+        ImageDraw.Draw(glyph).text((0, 0), char, fill=255, font=font)
+        return np.asarray(glyph)
+
+    cell_width, cell_height = glyph_cell_size(font, chars + "M")
+    placeholder = render(MISSING_GLYPH)
+
+    coverage = []
+    for char in chars:
+        glyph = render(char)
+        if char.isspace() or not np.array_equal(glyph, placeholder):
+            coverage.append(float(glyph.mean()) / 255)
+            continue
+        known = geometric_coverage(char)
+        if known is None:
+            raise ValueError(f"font has no glyph for {char!r}; choose a font that covers the ramp")
+        coverage.append(known)
+    return coverage
+
+
+# Characters of chars ordered densest first; ties keep their given order
+def order_by_coverage(chars, font):
+    coverage = measure_coverage(chars, font)
+    return "".join(chars[i] for i in sorted(range(len(chars)), key=lambda i: -coverage[i]))
+
+
+# Identifies a font in the table cache key without loading it; Pillow's built-in font has no path
+def font_key(font_path):
+    if not font_path:
+        return ["default", RAMP_FONT_SIZE]
+    stat = os.stat(font_path)
+    return [os.path.abspath(font_path), stat.st_size, int(stat.st_mtime), RAMP_FONT_SIZE]
+
+
+# The characters of a preset name or literal ramp, checked for length and repeats
+def resolve_ramp(spec):
+    chars = PRESET_RAMPS.get(spec, spec)
+    if len(set(chars)) != len(chars):
+        raise ValueError("ramp characters must not repeat")
+    if not MIN_RAMP_CHARS <= len(chars) <= MAX_RAMP_CHARS:
+        raise ValueError(f"ramp needs {MIN_RAMP_CHARS} to {MAX_RAMP_CHARS} characters, got {len(chars)}")
+    return chars
+
+
+# Compile a preset name or literal ramp for font_path (None for the default font), returning the
+# characters densest first and their read-only lookup table. Cached in memory and on disk.
+@functools.lru_cache(maxsize=32)
+def compile_ramp(spec, font_path=None, cache_dir=None):
+    from image2ascii.cache import default_cache_dir, load_arrays, save_arrays
+
+    chars = resolve_ramp(spec)
+    params = json.dumps([RAMP_TABLE_VERSION, chars, font_key(font_path)])
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    cache_path = os.path.join(cache_dir, f"ramp-{hashlib.sha256(params.encode()).hexdigest()[:24]}.npz")
+
+    try:
+        codes, = load_arrays(cache_path, "chars")
+        ordered = "".join(chr(code) for code in codes.tolist())
+    except (OSError, ValueError, EOFError, KeyError):
+        ordered = order_by_coverage(chars, load_ramp_font(font_path))
+        # The table alone cannot give back the characters, so they are stored as code points next to it
+        save_arrays(cache_path, chars=np.array([ord(c) for c in ordered], dtype=np.uint32),
+                    lut=build_ascii_lut(ordered))
+
+    # Share the table with everything converting with this ramp in this process
+    return ordered, ramp_lut(ordered)
+
@@ -0,0 +1,383 @@
+"""Local HTTP conversion service.
+
+Usage::
+
+    python -m image2ascii.server --port 8765 --workers 4
+
+Endpoints:
+
+    POST /convert?width=120&height=40&ramp=...   body: the image file; ramp is characters or a preset
+                                                  name; add mode=shape to match glyph shapes, or
+                                                  dither=bayer|floyd-steinberg against banding
+    GET  /convert?path=/abs/image.png&width=120   convert a file on this machine
+    GET  /metrics                                 latency histograms (Prometheus text format)
+    GET  /health
+
+Conversions run in a bounded process pool. At most ``--max-concurrent``
+requests are converting at once; further requests are refused straight away
+with 429 and a Retry-After header rather than queueing without limit. A
+request that takes longer than ``--timeout`` seconds gets 504; its worker
+finishes in the background and the slot is only released when it does, so the
+concurrency limit always reflects real load on the pool. The ASCII text is
+sent back with chunked transfer encoding as it is written to the socket.
+
+Every request gets an answer: an image too large to decode gets 413, a worker
+pool broken by a crashed process is replaced and the request gets 503, and
+any other failure gets 500.
+
+Binds to 127.0.0.1 by default; there is no authentication.
+"""
+import argparse
+import io
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image, UnidentifiedImageError
+
+from image2ascii.core import ASCII_CHARS, MODES, image_to_ascii
+from image2ascii.dither import check_dither
+from image2ascii.ramps import compile_ramp, resolve_ramp
+from image2ascii.shapes import check_glyph_chars
+
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 30.0
+
+# Largest accepted upload
+MAX_UPLOAD_BYTES = 64 * 1024 * 1024
+
+# Largest accepted width or height, in characters
+MAX_DIMENSION = 2000
+
+# Size of each chunk of ASCII written back to the client
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram per label, rendered in Prometheus text format."""
+
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, seconds, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            counts, total = self.series.get(key, ([0] * len(self.buckets), [0, 0.0]))
+            self.series[key] = counts, total
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[i] += 1
+            total[0] += 1
+            total[1] += seconds
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for key, (counts, (count, total)) in sorted(self.series.items()):
+                labels = ",".join(f'{name}="{value}"' for name, value in key)
+                prefix = labels + "," if labels else ""
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {bucket_count}')
+                lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{self.name}_sum{suffix} {total:.6f}")
+                lines.append(f"{self.name}_count{suffix} {count}")
+        return "\n".join(lines) + "\n"
+
+
+# Worker entry point: source is an uploaded file's bytes or a local path
+def convert_source(source, new_width=None, new_height=None, chars=ASCII_CHARS, mode="brightness", dither="none"):
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    return image_to_ascii(source, new_width, new_height, chars=chars, mode=mode, dither=dither)
+
+
+class RequestError(Exception):
+    """Rejects a request with an HTTP status and message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ConversionService:
+    """The process pool, concurrency limit and metrics shared by all request threads."""
+
+    def __init__(self, workers=None, max_concurrent=None, timeout=DEFAULT_TIMEOUT, allow_paths=True):
+        workers = workers or os.cpu_count()
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.max_concurrent = max_concurrent or workers * 2
+        self.slots = threading.BoundedSemaphore(self.max_concurrent)
+        self.timeout = timeout
+        self.allow_paths = allow_paths
+        self.request_latency = LatencyHistogram(
+            "image2ascii_request_seconds", "Time from request start to the last byte sent, by endpoint and status.")
+        self.convert_latency = LatencyHistogram(
+            "image2ascii_convert_seconds", "Time spent in the worker pool per finished conversion.")
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def reserve(self):
+        """Takes a conversion slot, refusing with 429 when all are busy."""
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            raise RequestError(429, "Too many conversions in progress, retry shortly")
+        with self.lock:
+            self.in_flight += 1
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+        self.slots.release()
+
+    def replace_executor(self, broken):
+        """Starts a new pool in place of a broken one, unless another request already has."""
+        with self.lock:
+            if self.executor is not broken:
+                return
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def convert(self, source, new_width, new_height, chars, mode="brightness", dither="none"):
+        """Converts in the pool using a slot taken with reserve(), which is released when the worker finishes."""
+        start = time.perf_counter()
+        executor = self.executor
+        try:
+            future = executor.submit(convert_source, source, new_width, new_height, chars, mode, dither)
+        except BrokenProcessPool:
+            self.release()
+            self.replace_executor(executor)
+            raise RequestError(503, "Worker pool restarted, retry shortly") from None
+        except BaseException:
+            self.release()
+            raise
+
+        # The slot is held until the worker really finishes, even if the client has timed out
+        def finished(_):
+            self.convert_latency.observe(time.perf_counter() - start)
+            self.release()
+
+        future.add_done_callback(finished)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise RequestError(504, f"Conversion took longer than {self.timeout:g} s") from None
+        except BrokenProcessPool:
+            # A worker process died (killed, or out of memory); every conversion in the pool fails with it
+            self.replace_executor(executor)
+            raise RequestError(503, "A worker process died, retry shortly") from None
+        except (Image.DecompressionBombError, MemoryError):
+            raise RequestError(413, "Image is too large to convert") from None
+        except (UnidentifiedImageError, OSError, SyntaxError) as e:
+            raise RequestError(400, f"Unable to decode image: {e}") from None
+        except ValueError as e:
+            raise RequestError(400, str(e)) from None
+        except Exception as e:
+            raise RequestError(500, f"Conversion failed: {type(e).__name__}: {e}") from None
+
+    def metrics(self):
+        with self.lock:
+            gauges = (f"# TYPE image2ascii_in_flight gauge\nimage2ascii_in_flight {self.in_flight}\n"
+                      f"# TYPE image2ascii_max_concurrent gauge\nimage2ascii_max_concurrent {self.max_concurrent}\n"
+                      f"# TYPE image2ascii_rejected_total counter\nimage2ascii_rejected_total {self.rejected}\n")
+        return self.request_latency.render() + self.convert_latency.render() + gauges
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def optional_int(query, name):
+    value = query.get(name, [""])[0]
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        raise RequestError(400, f"{name} must be an integer") from None
+    if number <= 0:
+        raise RequestError(400, f"{name} must be positive")
+    if number > MAX_DIMENSION:
+        raise RequestError(400, f"{name} must be at most {MAX_DIMENSION}")
+    return number
+
+
+class ConversionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "Image2ASCII"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def do_GET(self):
+        self.handle_request()
+
+    def do_POST(self):
+        self.handle_request()
+
+    def handle_request(self):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        status = 500
+        try:
+            if url.path == "/convert":
+                status = self.handle_convert(parse_qs(url.query))
+            elif url.path == "/metrics" and self.command == "GET":
+                status = self.send_text(200, self.service.metrics(), "text/plain; version=0.0.4")
+            elif url.path == "/health" and self.command == "GET":
+                status = self.send_text(200, "ok\n")
+            else:
+                raise RequestError(404, f"No such endpoint: {self.command} {url.path}")
+        except RequestError as e:
+            headers = {"Retry-After": "1"} if e.status in (429, 503) else {}
+            status = self.send_text(e.status, f"{e}\n", headers=headers)
+        except (BrokenPipeError, ConnectionResetError):
+            status = 499  # Client went away mid-response
+        except Exception as e:
+            self.log_error("Unhandled error: %r", e)
+            status = self.send_text(500, "Internal server error\n")
+        finally:
+            self.service.request_latency.observe(time.perf_counter() - start, endpoint=url.path, status=status)
+
+    def handle_convert(self, query):
+        new_width = optional_int(query, "width")
+        new_height = optional_int(query, "height")
+        ramp = query.get("ramp", [None])[0]
+        mode = query.get("mode", ["brightness"])[0]
+        if mode not in MODES:
+            raise RequestError(400, f"Invalid mode: expected one of {', '.join(MODES)}")
+        dither = query.get("dither", ["none"])[0]
+        try:
+            check_dither(dither, mode)
+        except ValueError as e:
+            raise RequestError(400, f"Invalid dither: {e}") from None
+        chars = ASCII_CHARS
+        try:
+            if ramp and mode == "shape":
+                chars = resolve_ramp(ramp)
+                check_glyph_chars(chars)
+            elif ramp:
+                chars, _ = compile_ramp(ramp)  # Measured once, then served from the table cache
+        except ValueError as e:
+            raise RequestError(400, f"Invalid ramp: {e}") from None
+
+        if self.command == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            if length <= 0:
+                raise RequestError(411, "Send the image as the request body with a Content-Length")
+            if length > MAX_UPLOAD_BYTES:
+                raise RequestError(413, f"Uploads are limited to {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+        else:
+            if not self.service.allow_paths:
+                raise RequestError(403, "Converting local paths is disabled; POST the image instead")
+            source = query.get("path", [""])[0]
+            if not os.path.isfile(source):
+                raise RequestError(404, f"No such file: {source}")
+
+        # Refuse before reading the upload, so an overloaded server does not also buffer every body
+        self.service.reserve()
+        if self.command == "POST":
+            try:
+                source = self.rfile.read(length)
+            except BaseException:
+                self.service.release()
+                raise
+        ascii_bytes = self.service.convert(source, new_width, new_height, chars, mode, dither)
+        self.stream_text(ascii_bytes)
+        return 200
+
+    def stream_text(self, data):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        view = memoryview(data)
+        for offset in range(0, len(view), STREAM_CHUNK_BYTES):
+            chunk = view[offset:offset + STREAM_CHUNK_BYTES]
+            self.wfile.write(b"%x\r\n" % len(chunk))
+            self.wfile.write(chunk)
+            self.wfile.write(b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def send_text(self, status, text, content_type="text/plain", headers=None):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8" if "charset" not in content_type
+                         else content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status >= 400 and self.command == "POST":
+            # The upload body may be unread and would be parsed as the next request, so end the connection
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+        return status
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class ConversionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service, quiet=False):
+        super().__init__(address, ConversionHandler)
+        self.service = service
+        self.quiet = quiet
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="image2ascii.server", description="Serve image to ASCII conversions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on (default: %(default)s)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument("--max-concurrent", type=int, default=None,
+                        help="conversions allowed at once before answering 429 (default: twice the workers)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="seconds before a conversion request gets 504 (default: %(default)s)")
+    parser.add_argument("--no-paths", action="store_true", help="only accept uploaded images, not local paths")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not log each request")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    service = ConversionService(args.workers, args.max_concurrent, args.timeout, allow_paths=not args.no_paths)
+    server = ConversionServer((args.host, args.port), service, quiet=args.quiet)
+    print(f"Serving on http://{args.host}:{server.server_port} with {args.workers} workers, "
+          f"{service.max_concurrent} concurrent conversions", flush=True)
+    # Stop cleanly on SIGTERM too, so the worker processes are shut down with the server
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Glyph-shape matching: pick each character by the shape of its cell, not only its brightness.
+
+Every glyph of a character set is rendered once and box-filtered down to a
+small ``CELL_SHAPE`` grid of ink coverage values; these features are cached
+on disk. The image is resized so each output cell covers one such grid of
+pixels, and every cell is matched to the glyph with the nearest features in
+one matrix product per band of rows:
+
+    |x - g|^2 = |x|^2 - 2 x.g + |g|^2, so argmin over g of |g|^2 - 2 x.g
+
+Edges and thin lines come out as ``/``, ``|``, ``_`` and friends instead of
+a flat brightness level, at the same output width.
+"""
+import functools
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from image2ascii.core import decode_for_size, grayscale_image, output_size
+from image2ascii.instrument import NULL_INSTRUMENTATION
+
+# Character set matched against, from blank to dense; ASCII only so output stays plain text
+SHAPE_CHARS = " .,:;'`\"^-_~=+*<>!|/\\()[]{}icrvxzsunoaeltfjIJLTYVXCUOQZ0%&#@MWB8"
+
+# Feature grid per cell (columns, rows). Cells cover a source area about
+# RATIO_ADJUSTMENT_NUM times taller than wide, so the grid keeps that shape.
+CELL_SHAPE = (4, 11)
+
+# Bump when the feature computation changes, so stale cached features are ignored
+GLYPH_FEATURES_VERSION = 1
+
+# Cells matched per matrix product, bounding the (cells, glyphs) distance matrix
+MATCH_BATCH_CELLS = 1 << 15
+
+
+# Identifies a font in the glyph cache key; Pillow's built-in default font has no file path
+def font_description(font):
+    path = getattr(font, "path", None)
+    return [path if isinstance(path, str) else type(font).__name__, getattr(font, "size", None)]
+
+
+def load_font(font=None):
+    from PIL import ImageFont
+    return font or ImageFont.load_default()
+
+
+# Ink coverage (0 blank to 1 solid) of each glyph on the feature grid, shape (glyphs, grid cells)
+def render_glyph_features(chars=SHAPE_CHARS, font=None, cell_shape=CELL_SHAPE):
+    from PIL import Image, ImageDraw
+
+    from image2ascii.preview import glyph_cell_size
+
+    font = load_font(font)
+    cell_width, cell_height = glyph_cell_size(font, chars)
+
+    features = []
+    for char in chars:
+        glyph = Image.new("L", (cell_width, cell_height), 0)
+        ImageDraw.Draw(glyph).text((0, 0), char, fill=255, font=font)
+        features.append(np.asarray(glyph.resize(cell_shape, Image.Resampling.BOX), dtype=np.float32).ravel())
+    return np.stack(features) / 255.0
+
+
+# Raise ValueError unless chars can be matched as a glyph set
+def check_glyph_chars(chars):
+    if not chars or not chars.isascii():
+        raise ValueError("shape matching characters must be ASCII")
+    if len(set(chars)) != len(chars):
+        raise ValueError("shape matching characters must not repeat")
+
+
+class GlyphSet:
+    """Glyph features for one character set, font and grid, cached on disk after the first render."""
+
+    def __init__(self, chars=SHAPE_CHARS, font=None, cell_shape=CELL_SHAPE, cache_dir=None):
+        from image2ascii.cache import default_cache_dir, load_arrays, save_arrays
+
+        check_glyph_chars(chars)
+        self.chars = chars
+        self.codes = np.frombuffer(chars.encode("ascii"), dtype=np.uint8)
+        self.cell_shape = cell_shape
+
+        font = load_font(font)
+        params = json.dumps([GLYPH_FEATURES_VERSION, chars, list(cell_shape), font_description(font)])
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+        self.cache_path = os.path.join(cache_dir, f"glyphs-{hashlib.sha256(params.encode()).hexdigest()[:24]}.npz")
+
+        try:
+            self.features, = load_arrays(self.cache_path, "features")
+        except (OSError, ValueError, EOFError, KeyError):
+            self.features = render_glyph_features(chars, font, cell_shape)
+            save_arrays(self.cache_path, features=self.features)
+
+        # Image cells are scaled so solid black has the ink of the densest glyph
+        self.max_coverage = float(self.features.mean(axis=1).max()) or 1.0
+        self.norms = (self.features ** 2).sum(axis=1)
+
+    def match(self, pixels, progress=None):
+        """Best glyph code per cell for a grayscale array of whole feature grids, shape (rows, columns)."""
+        grid_width, grid_height = self.cell_shape
+        rows, columns = pixels.shape[0] // grid_height, pixels.shape[1] // grid_width
+
+        # (rows, grid_height, columns, grid_width) -> (rows, columns, grid cells)
+        cells = pixels[:rows * grid_height, :columns * grid_width].reshape(rows, grid_height, columns, grid_width)
+        cells = cells.transpose(0, 2, 1, 3).reshape(rows, columns, grid_width * grid_height)
+
+        scale = np.float32(self.max_coverage / 255.0)
+        features_t = (self.features * 2).T.astype(np.float32)
+        norms = self.norms.astype(np.float32)
+        codes = np.empty((rows, columns), dtype=np.uint8)
+
+        batch_rows = max(1, MATCH_BATCH_CELLS // max(1, columns))
+        for start in range(0, rows, batch_rows):
+            stop = min(start + batch_rows, rows)
+            ink = (255 - cells[start:stop].astype(np.float32)) * scale
+            distances = norms - ink @ features_t  # |g|^2 - 2 x.g, per cell and glyph
+            codes[start:stop] = self.codes[distances.argmin(axis=-1)]
+            if progress is not None:
+                progress(stop)
+        return codes
+
+
+# One GlyphSet per character set and process, so repeated conversions skip even the disk cache
+@functools.lru_cache(maxsize=8)
+def glyph_set(chars=SHAPE_CHARS):
+    return GlyphSet(chars)
+
+
+# Newline-terminated rows of a 2D array of character codes
+def codes_to_ascii(codes):
+    height, width = codes.shape
+    out = np.empty((height, width + 1), dtype=np.uint8)
+    out[:, :width] = codes
+    out[:, width] = ord('\n')
+    return out.tobytes()
+
+
+# Convert an opened image by glyph shape, returning the ASCII bytes
+def shape_image_to_ascii(image, new_width=None, new_height=None, glyphs=None, progress=None,
+                         instrumentation=NULL_INSTRUMENTATION):
+    if glyphs is None:
+        glyphs = glyph_set()
+    columns, rows = output_size(image.size, new_width, new_height)
+    grid_width, grid_height = glyphs.cell_shape
+    size = (columns * grid_width, rows * grid_height)
+
+    # Each cell is already sampled at several pixels per grid, so no extra decode margin is needed
+    with instrumentation.stage("decode"):
+        decoded, box = decode_for_size(image, size, oversample=1)
+    with instrumentation.stage("resize"):
+        resized = decoded.resize(size, box=box)
+    with instrumentation.stage("grayscale"):
+        pixels = np.asarray(grayscale_image(resized))
+    with instrumentation.stage("match"):
+        return codes_to_ascii(glyphs.match(pixels, progress))
@@ -0,0 +1,232 @@
+"""Bounded-memory streaming conversion for very large images.
+
+The source is read in horizontal strips of ``strip_rows`` rows, each read
+once. Like ``decode_for_size``, every strip is first shrunk by an integer
+factor with ``reduce()``, on row boundaries aligned to that factor, so the
+result matches reducing the whole image. The reduced rows collect in a small
+rolling buffer. Output rows are resized from it as soon as the rows their
+filter needs are in, and are converted to grayscale, mapped and written
+straight to the output file. The buffer keeps only the filter margin of a few
+reduced rows between strips, whatever the downscale. Neither the full
+grayscale copy nor the full output string is ever held in memory.
+
+Uncompressed sources (BMP, TGA, PPM, raw TIFF strips) are read strip by strip
+from the file using the offsets in Pillow's tile descriptors, so peak memory
+is bounded by the strip size. Pillow's decompression-bomb limit is lifted for
+them, since gigapixel sources are what streaming is for. Compressed single-stream formats such as PNG and
+JPEG cannot be decoded part way by Pillow; for those the source is decoded
+once, through ``decode_for_size`` so that JPEGs are decoded at reduced size
+with DCT scaling, and only the later stages are streamed. Memory then grows
+with the decoded image rather than the strip size, so the conversion reports
+that it fell back and at what size it decoded, and Pillow's limit still
+applies to that decode.
+
+The output size is worked out exactly as in ``load_resized``. Rows are
+resized with an explicit source box, which reproduces a whole-image resize for
+the smoothing filters up to rounding: at band edges a filter weight can round
+differently and move a cell by one gray level. Palette and bilevel images are
+resampled with nearest neighbour and may pick a neighbouring source row at
+strip boundaries.
+"""
+import contextlib
+import math
+
+import numpy as np
+from PIL import Image, ImageMode
+
+from image2ascii.core import (ASCII_CHARS, decode_for_size, grayscale_image, output_size, ramp_lut, reduce_factor,
+                              render_ascii)
+
+# Default number of source rows read per strip
+STRIP_ROWS = 256
+
+# Extra reduced rows kept above and below each band of output rows (in output rows) so the
+# resampling filter sees the same neighbourhood as a whole-image resize; 3 covers every Pillow filter
+RESAMPLE_SUPPORT = 3
+
+
+# Open image_path without Pillow's decompression-bomb check, returning the image and the limit
+# that was lifted. The limit is global, so another thread opening an image meanwhile skips it too.
+def open_unlimited(image_path):
+    limit = Image.MAX_IMAGE_PIXELS
+    Image.MAX_IMAGE_PIXELS = None
+    try:
+        return Image.open(image_path), limit
+    finally:
+        Image.MAX_IMAGE_PIXELS = limit
+
+
+# Normalise the args of a "raw" tile into (rawmode, stride, orientation)
+def _raw_tile_args(args):
+    if isinstance(args, str):
+        return args, 0, 1
+    rawmode = args[0]
+    stride = args[1] if len(args) > 1 else 0
+    orientation = args[2] if len(args) > 2 else 1
+    return rawmode, stride, orientation
+
+
+# Byte-swapped raw modes used by BMP and TGA that are not image modes in their own right
+RAWMODE_PIXEL_BYTES = {"BGR": 3, "BGRX": 4, "BGRA": 4, "ABGR": 4, "XBGR": 4}
+
+
+# Bytes per row of a packed raw tile, or None if the raw mode is not a whole-byte pixel format
+def _packed_stride(rawmode, width):
+    if rawmode == "1":
+        return (width + 7) // 8
+    if rawmode in RAWMODE_PIXEL_BYTES:
+        return width * RAWMODE_PIXEL_BYTES[rawmode]
+    try:
+        mode = ImageMode.getmode(rawmode)
+    except KeyError:
+        return None
+    return width * len(mode.bands) * np.dtype(mode.typestr).itemsize
+
+
+class RawStripReader:
+    """Reads rows of an uncompressed image directly from its file."""
+
+    # Why memory is not bounded by the strip size, or None when it is
+    fallback = None
+
+    def __init__(self, image):
+        self.image = image
+        self.width, self.height = image.size
+        self.box = (0, 0, self.width, self.height)  # Region of the rows covering the whole source
+        self.segments = []
+        for tile in sorted(image.tile, key=lambda t: t[1][1]):
+            _, (x0, y0, x1, y1), offset, args = tile
+            rawmode, stride, orientation = _raw_tile_args(args)
+            if not stride:
+                stride = _packed_stride(rawmode, x1 - x0)
+            self.segments.append((y0, y1, offset, rawmode, stride, orientation))
+        self.rawmode = self.segments[0][3]
+        self.row_bytes = _packed_stride(self.rawmode, self.width)
+
+    @classmethod
+    def supports(cls, image):
+        width, _ = image.size
+        if not image.tile or getattr(image, "n_frames", 1) > 1:
+            return False
+        rawmodes = set()
+        for codec, (x0, _, x1, _), _, args in image.tile:
+            if codec != "raw" or x0 != 0 or x1 != width:
+                return False
+            rawmode, stride, orientation = _raw_tile_args(args)
+            if orientation not in (1, -1) or _packed_stride(rawmode, width) is None:
+                return False
+            rawmodes.add(rawmode)
+        return len(rawmodes) == 1
+
+    def read(self, top, bottom):
+        """Returns source rows [top, bottom) as an image in the source mode."""
+        fp = self.image.fp
+        rows = []
+        for y0, y1, offset, _, stride, orientation in self.segments:
+            for y in range(max(top, y0), min(bottom, y1)):
+                row = y - y0 if orientation == 1 else y1 - 1 - y
+                fp.seek(offset + row * stride)
+                rows.append(fp.read(self.row_bytes))
+
+        strip = Image.frombytes(self.image.mode, (self.width, bottom - top), b"".join(rows),
+                                "raw", self.rawmode, self.row_bytes, 1)
+        if self.image.mode == "P" and self.image.palette is not None:
+            palette_mode, palette = self.image.palette.getdata()
+            strip.putpalette(palette, palette_mode)
+        return strip
+
+
+class LoadedStripReader:
+    """Fallback for compressed formats: decodes once, as small as the output allows, and crops strips from it."""
+
+    def __init__(self, image, size, max_pixels=None):
+        self.image, self.box = decode_for_size(image, size, max_pixels=max_pixels)
+        self.width, self.height = self.image.size
+        # image.size is what the decoder produced, before any reduce(): smaller only for JPEG
+        decoded_width, decoded_height = image.size
+        self.fallback = (f"{image.format or 'this format'} cannot be read in strips, "
+                         f"decoded whole at {decoded_width}x{decoded_height}")
+
+    def read(self, top, bottom):
+        return self.image.crop((0, top, self.width, bottom))
+
+
+# Strip reader for an opened image that will be resized to size; max_pixels limits a whole decode
+def strip_reader(image, size, max_pixels=None):
+    if RawStripReader.supports(image):
+        return RawStripReader(image)
+    return LoadedStripReader(image, size, max_pixels)
+
+
+# Append image below the rows of buffer (either may be None)
+def _append_rows(buffer, image):
+    if buffer is None or buffer.height == 0:
+        return image
+    joined = Image.new(buffer.mode, (buffer.width, buffer.height + image.height))
+    joined.paste(buffer, (0, 0))
+    joined.paste(image, (0, buffer.height))
+    if buffer.mode == "P" and buffer.palette is not None:
+        palette_mode, palette = buffer.palette.getdata()
+        joined.putpalette(palette, palette_mode)
+    return joined
+
+
+# Convert an image file to ASCII a strip at a time, writing rows to output_path as they finish.
+# Returns the output (width, height) and why memory was not bounded by the strip size, or None.
+def convert_image_streaming(image_path, output_path, new_width=None, new_height=None,
+                            strip_rows=STRIP_ROWS, progress=None, chars=ASCII_CHARS):
+    lut = ramp_lut(chars)
+    image, limit = open_unlimited(image_path)
+    with contextlib.closing(image):
+        width, height = output_size(image.size, new_width, new_height)
+
+        # Rows are counted in the reader's pixels, which may be a reduced decode of the source
+        reader = strip_reader(image, (width, height), max_pixels=2 * limit if limit else None)
+        _, _, source_width, source_height = reader.box
+        factor = reduce_factor((reader.width, reader.height), (width, height), image.mode)
+        scale = source_height / height / factor  # Reduced rows per output row
+        if image.mode in ("1", "P"):
+            margin = 1  # Nearest neighbour reads a single row
+        else:
+            margin = math.ceil(RESAMPLE_SUPPORT * max(scale, 1.0)) + 1
+        read_rows = max(1, strip_rows // factor) * factor  # Whole blocks of the reduce factor
+
+        buffer = None  # Reduced rows [buffer_top, buffer_top + buffer.height)
+        buffer_top = 0
+        start = 0  # Next output row
+        with open(output_path, "w", encoding="utf-8") as f:
+            for read_top in range(0, reader.height, read_rows):
+                read_bottom = min(read_top + read_rows, reader.height)
+                strip = reader.read(read_top, read_bottom)
+                if factor > 1:
+                    strip = strip.reduce(factor)
+                buffer = _append_rows(buffer, strip)
+                buffer_bottom = buffer_top + buffer.height
+
+                # Output rows whose filter window, margin included, is now inside the buffer
+                if read_bottom == reader.height:
+                    stop = height
+                else:
+                    stop = min(height, math.floor((buffer_bottom - margin) / scale))
+                if stop <= start:
+                    continue
+
+                top, bottom = start * scale, stop * scale
+                band_top = max(buffer_top, math.floor(top) - margin)
+                band_bottom = min(buffer_bottom, math.ceil(bottom) + margin)
+                band = buffer.crop((0, band_top - buffer_top, buffer.width, band_bottom - buffer_top))
+                band = band.resize((width, stop - start),
+                                   box=(0, top - band_top, source_width / factor, bottom - band_top))
+                band = grayscale_image(band)
+                f.write(render_ascii(np.array(band), lut).decode("utf-8"))
+                start = stop
+
+                # Drop the rows no later output row can reach
+                keep_top = max(buffer_top, math.floor(start * scale) - margin)
+                buffer = buffer.crop((0, keep_top - buffer_top, buffer.width, buffer.height))
+                buffer_top = keep_top
+
+                if progress is not None:
+                    progress(stop)
+
+    return width, height, reader.fallback
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from image2ascii.dither import floyd_steinberg_dither, level_values
+
+
+# Textbook Floyd-Steinberg, one cell at a time, pushing each error onto the neighbours still to come
+def reference_floyd_steinberg(pixels, values):
+    levels = len(values)
+    work = pixels.astype(np.float64) * (levels - 1) / 255
+    height, width = work.shape
+    chosen = np.empty(pixels.shape, dtype=np.intp)
+    for y in range(height):
+        for x in range(width):
+            level = min(max(round(work[y, x]), 0), levels - 1)
+            chosen[y, x] = level
+            error = work[y, x] - level
+            if x + 1 < width:
+                work[y, x + 1] += error * 7 / 16
+            if y + 1 < height:
+                if x > 0:
+                    work[y + 1, x - 1] += error * 3 / 16
+                work[y + 1, x] += error * 5 / 16
+                if x + 1 < width:
+                    work[y + 1, x + 1] += error / 16
+    return values[chosen]
+
+
+@pytest.mark.parametrize("levels", [2, 5, 10, 16])
+@pytest.mark.parametrize("shape", [(40, 60), (1, 50), (50, 1), (13, 7)])
+def test_floyd_steinberg_matches_the_reference(levels, shape):
+    pixels = np.random.default_rng(levels).integers(0, 256, shape, dtype=np.uint8)
+    values = level_values(levels)
+
+    assert np.array_equal(floyd_steinberg_dither(pixels, values), reference_floyd_steinberg(pixels, values))
+
+
+def test_floyd_steinberg_keeps_a_gradients_brightness():
+    pixels = np.tile(np.linspace(0, 255, 64).astype(np.uint8), (30, 1))
+    values = level_values(10)
+
+    dithered = floyd_steinberg_dither(pixels, values)
+
+    # Levels are evenly spaced, so each column's average level stays close to its brightness
+    levels = np.searchsorted(values, dithered) * (255 / 9)
+    assert np.abs(levels.mean(axis=0) - pixels.mean(axis=0)).max() < 255 / 9 / 2
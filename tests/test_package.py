@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# Run code in a fresh interpreter without a display, returning its stdout
+def run_headless(code):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop("DISPLAY", None)
+    env.pop("WAYLAND_DISPLAY", None)
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def test_star_import_works_headless():
+    output = run_headless("import sys\n"
+                          "from image2ascii import *\n"
+                          "print(callable(image_to_ascii), 'ImageApp' in dir(), 'pyglet' in sys.modules)")
+    assert output.split() == ["True", "False", "False"]
+
+
+def test_import_loads_no_submodules():
+    output = run_headless("import sys, image2ascii\n"
+                          "print(sorted(name for name in sys.modules if name.startswith('image2ascii.')))")
+    assert output.strip() == "[]"
@@ -0,0 +1,27 @@
+import pytest
+
+from image2ascii.core import image_to_ascii
+from image2ascii.packed import BLOCK_ROWS, COMPRESSIONS, PackedReader, decode_packed, write_packed
+from test_stream import noise_image
+
+
+@pytest.mark.parametrize("compression", sorted(COMPRESSIONS))
+@pytest.mark.parametrize("width", [1, 7, 80])
+def test_packed_round_trip(tmp_path, compression, width):
+    source = tmp_path / "noise.png"
+    noise_image(40, 8000).save(source)
+    text = image_to_ascii(source, width)
+    path = tmp_path / "art.i2a"
+
+    write_packed(path, text, compression=COMPRESSIONS[compression], source_digest="ab" * 32)
+
+    assert decode_packed(path) == text
+    lines = text.decode("ascii").splitlines()
+    with PackedReader(path) as reader:
+        assert len(reader) == len(lines) > BLOCK_ROWS
+        assert reader.source_digest == "ab" * 32
+        # Rows across block boundaries, read out of order
+        for index in (len(lines) - 1, 0, BLOCK_ROWS, BLOCK_ROWS - 1, -1):
+            assert reader.row(index) == lines[index]
+        assert reader.read_rows(BLOCK_ROWS - 2, BLOCK_ROWS + 3) == "".join(
+            line + "\n" for line in lines[BLOCK_ROWS - 2:BLOCK_ROWS + 3]).encode("ascii")
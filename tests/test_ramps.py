@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from image2ascii import ramps
+from image2ascii.core import ASCII_CHARS, ASCII_LUT, build_ascii_lut, render_ascii
+
+
+@pytest.fixture(autouse=True)
+def fresh_compile_cache():
+    ramps.compile_ramp.cache_clear()
+    yield
+    ramps.compile_ramp.cache_clear()
+
+
+def test_default_table_is_the_original_mapping():
+    expected = [ord(ASCII_CHARS[value // 32]) if value != 255 else ord(" ") for value in range(256)]
+    assert ASCII_LUT.tolist() == expected
+
+
+def test_other_ramps_get_equal_bands():
+    lut = build_ascii_lut("ab")
+    assert lut[:128].tolist() == [ord("a")] * 128
+    assert lut[128:].tolist() == [ord("b")] * 128
+
+
+@pytest.mark.parametrize("measured", [ASCII_CHARS, "@#%*+=-:. ", "⣿⣷⣧⣇⡇⠇⠃⠁⠀"])
+def test_cached_ramp_gives_back_the_measured_order(tmp_path, monkeypatch, measured):
+    monkeypatch.setattr(ramps, "order_by_coverage", lambda chars, font: measured)
+    first = ramps.compile_ramp(measured, cache_dir=str(tmp_path))
+    ramps.compile_ramp.cache_clear()
+    monkeypatch.setattr(ramps, "order_by_coverage", lambda chars, font: pytest.fail("measured again"))
+
+    second = ramps.compile_ramp(measured, cache_dir=str(tmp_path))
+
+    assert second[0] == first[0] == measured
+    pixels = np.arange(256, dtype=np.uint8).reshape(16, 16)
+    assert render_ascii(pixels, second[1]) == render_ascii(pixels, first[1])
@@ -0,0 +1,37 @@
+from PIL import Image
+
+from image2ascii.core import image_to_ascii, output_size
+from image2ascii.frames import convert_frames_to_ascii, read_frame_sequence
+from image2ascii.renditions import render_renditions
+from image2ascii.shapes import shape_image_to_ascii
+
+
+def test_output_size_keeps_at_least_one_character():
+    assert output_size((1000, 10), 1) == (1, 1)
+    assert output_size((10, 1000), None, 1) == (1, 1)
+    assert output_size((1, 1), 0, 0) == (1, 1)
+
+
+def test_still_image_at_width_one(tmp_path):
+    source = tmp_path / "wide.png"
+    Image.new("L", (1000, 10)).save(source)
+
+    assert image_to_ascii(source, 1) == b"@\n"
+
+
+def test_animation_at_width_one(tmp_path):
+    source = tmp_path / "wide.gif"
+    frames = [Image.new("L", (1000, 10), value) for value in (0, 255)]
+    frames[0].save(source, save_all=True, append_images=frames[1:], duration=50)
+    output = tmp_path / "wide_ASCII_frames.txt"
+
+    convert_frames_to_ascii(str(source), str(output), 1, max_workers=1)
+
+    assert [text for _, text in read_frame_sequence(str(output))] == ["@\n", " \n"]
+
+
+def test_shapes_and_renditions_at_width_one(tmp_path):
+    image = Image.new("L", (1000, 10))
+
+    assert shape_image_to_ascii(image, 1).count(b"\n") == 1
+    assert [text.count(b"\n") for text in render_renditions(image, [(1, None), (2, None)])] == [1, 1]
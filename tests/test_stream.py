@@ -0,0 +1,80 @@
+import struct
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from image2ascii.core import ASCII_CHARS, image_to_ascii
+from image2ascii.stream import convert_image_streaming
+
+
+# Write an 8-bit grayscale BMP whose pixel data is a hole in the file, so it takes no disk space
+def sparse_bmp(path, width, height):
+    stride = (width + 3) // 4 * 4
+    offset = 14 + 40 + 256 * 4
+    with open(path, "wb") as f:
+        f.write(b"BM" + struct.pack("<IHHI", offset + stride * height, 0, 0, offset))
+        f.write(struct.pack("<IiiHHIIiiII", 40, width, height, 1, 8, 0, stride * height, 2835, 2835, 256, 0))
+        f.write(b"".join(bytes((i, i, i, 0)) for i in range(256)))
+        f.truncate(offset + stride * height)
+
+
+def noise_image(width, height):
+    rng = np.random.default_rng(0)
+    return Image.fromarray((rng.random((height, width, 3)) * 255).astype(np.uint8))
+
+
+@pytest.mark.parametrize("width", [20, 80, 400])
+@pytest.mark.parametrize("strip_rows", [7, 64, 256])
+def test_streaming_matches_whole_image(tmp_path, width, strip_rows):
+    source = tmp_path / "noise.bmp"
+    noise_image(400, 3000).save(source)
+    output = tmp_path / "out.txt"
+
+    size = convert_image_streaming(source, output, width, strip_rows=strip_rows)[:2]
+
+    expected = image_to_ascii(source, width).decode("ascii")
+    streamed = output.read_text()
+    assert size == (width, expected.count("\n"))
+    assert len(streamed) == len(expected)
+    # Filter weights of a band can round one gray level apart from the whole image's at band edges
+    steps = [abs(ASCII_CHARS.index(a) - ASCII_CHARS.index(b))
+             for a, b in zip(streamed, expected) if a != b]
+    assert all(step == 1 for step in steps)
+    assert len(steps) <= len(expected) // 1000
+
+
+def test_streaming_opens_images_over_the_pixel_limit(tmp_path):
+    source = tmp_path / "huge.bmp"
+    sparse_bmp(source, 20000, 10000)  # 200 MP, over Pillow's decompression-bomb limit
+    output = tmp_path / "out.txt"
+
+    width, height, fallback = convert_image_streaming(source, output, 100)
+
+    assert (width, height, fallback) == (100, 17, None)
+    assert output.read_text() == ("@" * 100 + "\n") * 17
+
+
+def test_streaming_reads_each_source_row_once(tmp_path, monkeypatch):
+    from image2ascii import stream
+
+    reads = []
+    read = stream.RawStripReader.read
+    monkeypatch.setattr(stream.RawStripReader, "read", lambda self, top, bottom: reads.append(bottom - top)
+                        or read(self, top, bottom))
+    source = tmp_path / "tall.bmp"
+    sparse_bmp(source, 4000, 40000)
+
+    convert_image_streaming(source, tmp_path / "out.txt", 80, strip_rows=256)
+
+    assert sum(reads) == 40000
+    assert max(reads) <= 256
+
+
+def test_compressed_fallback_keeps_the_pixel_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+    source = tmp_path / "gray.png"
+    Image.new("L", (100, 100)).save(source)
+
+    with pytest.raises(Image.DecompressionBombError):
+        convert_image_streaming(source, tmp_path / "out.txt", 10)